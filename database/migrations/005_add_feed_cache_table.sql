@@ -0,0 +1,21 @@
+-- Migration: Add feed_cache table for conditional feed fetching
+-- Date: 2026-10-17
+-- Description: Stores ETag/Last-Modified validators per feed so unchanged feeds can be skipped with a 304
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS feed_cache (
+    feed_url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE feed_cache IS 'HTTP validators from the last successfully processed copy of each RSS feed';
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('005_add_feed_cache_table', '005_feed_cache_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
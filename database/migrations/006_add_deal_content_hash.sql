@@ -0,0 +1,21 @@
+-- Migration: Add content fingerprint to deals for change detection
+-- Date: 2026-10-17
+-- Description: Lets the scraper skip rewriting deals whose scraped content has not changed,
+--              and records how many entries were skipped per scrape
+
+BEGIN;
+
+-- Hash of title, description, price, votes and comments at last write
+ALTER TABLE deals ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+-- Separate counter for entries that were seen but needed no write
+ALTER TABLE scraping_logs ADD COLUMN IF NOT EXISTS unchanged_deals INTEGER DEFAULT 0;
+
+COMMENT ON COLUMN deals.content_hash IS 'SHA-256 of the scraped fields, used to skip no-op updates';
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('006_add_deal_content_hash', '006_content_hash_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,20 @@
+-- Migration: Trigram indexes for search term matching
+-- Date: 2026-10-17
+-- Description: Lets LOWER(column) LIKE '%term%' matching use GIN indexes instead of
+--              sequentially scanning deals for every matching job
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Expression indexes on exactly the expressions used by the matching queries
+CREATE INDEX IF NOT EXISTS idx_deals_title_lower_trgm ON deals USING gin (LOWER(title) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_deals_store_lower_trgm ON deals USING gin (LOWER(store) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_deals_description_lower_trgm ON deals USING gin (LOWER(description) gin_trgm_ops);
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('007_add_trigram_match_indexes', '007_trigram_indexes_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,31 @@
+-- Migration: Notify the matcher when matching jobs are queued
+-- Date: 2026-10-17
+-- Description: Sends pg_notify on the matching_jobs channel whenever a pending job is created
+--              or rescheduled, so the matcher can block on LISTEN instead of polling
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION notify_matching_job()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Payload is the job id; delivered when the inserting transaction commits
+    PERFORM pg_notify('matching_jobs', NEW.id::text);
+    
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Covers jobs created by the search term triggers and "search now" reschedules
+DROP TRIGGER IF EXISTS trigger_notify_matching_job ON matching_jobs;
+CREATE TRIGGER trigger_notify_matching_job
+    AFTER INSERT OR UPDATE OF scheduled_at, status ON matching_jobs
+    FOR EACH ROW
+    WHEN (NEW.status = 'pending')
+    EXECUTE FUNCTION notify_matching_job();
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('008_notify_matching_jobs', '008_notify_jobs_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
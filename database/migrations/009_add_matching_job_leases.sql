@@ -0,0 +1,22 @@
+-- Migration: Lease-based claiming for matching jobs
+-- Date: 2026-10-17
+-- Description: Records which matcher worker claimed a job and until when, so several matcher
+--              replicas can claim jobs with FOR UPDATE SKIP LOCKED and reclaim jobs of crashed workers
+
+BEGIN;
+
+ALTER TABLE matching_jobs ADD COLUMN IF NOT EXISTS claimed_by VARCHAR(255);
+ALTER TABLE matching_jobs ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP;
+
+-- Finding running jobs whose lease has expired
+CREATE INDEX IF NOT EXISTS idx_matching_jobs_lease ON matching_jobs(lease_expires_at) WHERE status = 'running';
+
+COMMENT ON COLUMN matching_jobs.claimed_by IS 'Matcher worker (host:pid) that claimed the job';
+COMMENT ON COLUMN matching_jobs.lease_expires_at IS 'Time after which a running job may be reclaimed by another worker';
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('009_add_matching_job_leases', '009_job_leases_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,46 @@
+-- Migration: Watermarks for continuous matching
+-- Date: 2026-10-17
+-- Description: Tracks how far the matcher has matched deals by (updated_at, id), and notifies the
+--              matcher when deals are inserted or updated so new and changed deals are matched promptly
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS matcher_watermarks (
+    name VARCHAR(50) PRIMARY KEY,
+    last_updated_at TIMESTAMP NOT NULL,
+    last_deal_id INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE matcher_watermarks IS 'Position up to which deals have been matched against all active search terms';
+
+-- Existing deals were already matched by the scraper and the term jobs
+INSERT INTO matcher_watermarks (name, last_updated_at, last_deal_id)
+VALUES ('deals', CURRENT_TIMESTAMP, 0)
+ON CONFLICT (name) DO NOTHING;
+
+-- Walking deals in watermark order
+CREATE INDEX IF NOT EXISTS idx_deals_updated_at_id ON deals(updated_at, id);
+
+CREATE OR REPLACE FUNCTION notify_deals_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- One notification per statement; a bulk upsert of a whole feed wakes the matcher once
+    PERFORM pg_notify('deals_changed', '');
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_notify_deals_changed ON deals;
+CREATE TRIGGER trigger_notify_deals_changed
+    AFTER INSERT OR UPDATE ON deals
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_deals_changed();
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('010_add_matcher_watermarks', '010_matcher_watermarks_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
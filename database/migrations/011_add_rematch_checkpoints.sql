@@ -0,0 +1,28 @@
+-- Migration: Checkpoints for resumable rematch runs
+-- Date: 2026-10-17
+-- Description: Records how far each deal-id shard of a full rematch has progressed, so an
+--              interrupted match_existing_deals.py run resumes where it stopped
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS rematch_checkpoints (
+    run_key VARCHAR(64) NOT NULL,
+    shard_start INTEGER NOT NULL,
+    shard_end INTEGER NOT NULL,
+    last_deal_id INTEGER NOT NULL,
+    deals_processed INTEGER NOT NULL DEFAULT 0,
+    matches_created INTEGER NOT NULL DEFAULT 0,
+    completed BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_key, shard_start)
+);
+
+COMMENT ON TABLE rematch_checkpoints IS 'Progress of each shard of a rematch run; rows are removed when the run completes';
+COMMENT ON COLUMN rematch_checkpoints.run_key IS 'Hash of the run parameters (search terms and --since)';
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('011_add_rematch_checkpoints', '011_rematch_checkpoints_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,65 @@
+-- Migration: Stored deal liveness flag
+-- Date: 2026-10-17
+-- Description: Adds deals.is_live (active, not titled "expired" and not past its expiry date), kept
+--              current by a trigger on writes and a periodic sweep of time-based expiries, with
+--              partial indexes so listing live deals no longer evaluates ILIKE '%expired%' per row
+
+BEGIN;
+
+ALTER TABLE deals ADD COLUMN IF NOT EXISTS is_live BOOLEAN NOT NULL DEFAULT TRUE;
+
+COMMENT ON COLUMN deals.is_live IS 'Active, not marked expired in the title and not past expiry_date; see set_deal_is_live()';
+
+CREATE OR REPLACE FUNCTION set_deal_is_live()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.is_live := NEW.is_active IS TRUE
+        AND LOWER(NEW.title) NOT LIKE '%expired%'
+        AND (NEW.expiry_date IS NULL OR NEW.expiry_date > LOCALTIMESTAMP);
+    
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recomputed whenever a column it depends on is written (ingestion, the expired checker,
+-- manual expiry); deals whose future expiry_date passes are handled by sweep_expired_deals()
+DROP TRIGGER IF EXISTS trigger_set_deal_is_live ON deals;
+CREATE TRIGGER trigger_set_deal_is_live
+    BEFORE INSERT OR UPDATE OF is_active, title, expiry_date ON deals
+    FOR EACH ROW
+    EXECUTE FUNCTION set_deal_is_live();
+
+CREATE OR REPLACE FUNCTION sweep_expired_deals()
+RETURNS INTEGER AS $$
+DECLARE
+    swept INTEGER;
+BEGIN
+    UPDATE deals SET is_live = FALSE
+    WHERE is_live AND expiry_date <= LOCALTIMESTAMP;
+    
+    GET DIAGNOSTICS swept = ROW_COUNT;
+    RETURN swept;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill; only rows that are not live need writing
+UPDATE deals SET is_live = FALSE
+WHERE is_live
+AND NOT (
+    is_active IS TRUE
+    AND LOWER(title) NOT LIKE '%expired%'
+    AND (expiry_date IS NULL OR expiry_date > LOCALTIMESTAMP)
+);
+
+-- Newest live deals (dashboard, deal listings) and live deals per store
+CREATE INDEX IF NOT EXISTS idx_deals_live_created_at ON deals(created_at DESC) WHERE is_live;
+CREATE INDEX IF NOT EXISTS idx_deals_live_store ON deals(store) WHERE is_live;
+-- Live deals with an expiry date, for the sweep
+CREATE INDEX IF NOT EXISTS idx_deals_live_expiry_date ON deals(expiry_date) WHERE is_live AND expiry_date IS NOT NULL;
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('012_add_deal_is_live', '012_deal_is_live_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,18 @@
+-- Migration: Keyset pagination index for deal listings
+-- Date: 2026-10-17
+-- Description: Replaces the live created_at index with one on (created_at DESC, id DESC) so the
+--              deals page can seek straight to a (created_at, id) cursor and read one page in order
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_deals_live_created_at_id ON deals(created_at DESC, id DESC) WHERE is_live;
+
+-- Covered by the index above, which also serves plain newest-first listings
+DROP INDEX IF EXISTS idx_deals_live_created_at;
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('013_add_deal_page_index', '013_deal_page_index_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,252 @@
+-- Migration: Incrementally maintained statistics counters
+-- Date: 2026-10-17
+-- Description: Adds deal_stats, one row per counter, kept current by statement-level triggers on
+--              deals, search_terms and search_matches, so statistics are read by primary key
+--              instead of counted. reconcile_deal_stats() recounts everything and fixes drift
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS deal_stats (
+    name VARCHAR(50) PRIMARY KEY,
+    value BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE deal_stats IS 'Counters maintained by triggers; see reconcile_deal_stats()';
+
+-- Add deltas to counters in one statement, skipping the ones that did not change
+CREATE OR REPLACE FUNCTION add_deal_stats(names TEXT[], deltas BIGINT[])
+RETURNS VOID AS $$
+BEGIN
+    UPDATE deal_stats s
+    SET value = s.value + d.delta, updated_at = CURRENT_TIMESTAMP
+    FROM unnest(names, deltas) AS d(name, delta)
+    WHERE s.name = d.name AND d.delta <> 0;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION count_deal_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    added BIGINT[] := ARRAY[0, 0, 0, 0, 0];
+    removed BIGINT[] := ARRAY[0, 0, 0, 0, 0];
+    matches_delta BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT ARRAY[
+            COUNT(*),
+            COUNT(*) FILTER (WHERE is_active),
+            COUNT(*) FILTER (WHERE is_live),
+            COUNT(*) FILTER (WHERE is_active AND NOT is_live),
+            COUNT(*) FILTER (WHERE expiry_date IS NOT NULL)
+        ] INTO added FROM new_table;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        SELECT ARRAY[
+            COUNT(*),
+            COUNT(*) FILTER (WHERE is_active),
+            COUNT(*) FILTER (WHERE is_live),
+            COUNT(*) FILTER (WHERE is_active AND NOT is_live),
+            COUNT(*) FILTER (WHERE expiry_date IS NOT NULL)
+        ] INTO removed FROM old_table;
+    END IF;
+
+    -- Matches of deals that became live or stopped being live
+    IF TG_OP = 'UPDATE' THEN
+        SELECT COALESCE(SUM(CASE WHEN n.is_live THEN 1 ELSE -1 END), 0) INTO matches_delta
+        FROM new_table n
+        JOIN old_table o ON o.id = n.id
+        JOIN search_matches sm ON sm.deal_id = n.id
+        WHERE n.is_live IS DISTINCT FROM o.is_live;
+    END IF;
+
+    PERFORM add_deal_stats(
+        ARRAY['total_deals', 'active_deals', 'live_deals', 'expired_deals', 'dated_deals', 'live_matches'],
+        ARRAY[
+            added[1] - removed[1], added[2] - removed[2], added[3] - removed[3],
+            added[4] - removed[4], added[5] - removed[5], matches_delta
+        ]
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger
+DROP TRIGGER IF EXISTS trigger_count_deal_inserts ON deals;
+CREATE TRIGGER trigger_count_deal_inserts
+    AFTER INSERT ON deals
+    REFERENCING NEW TABLE AS new_table
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_deal_changes();
+
+DROP TRIGGER IF EXISTS trigger_count_deal_updates ON deals;
+CREATE TRIGGER trigger_count_deal_updates
+    AFTER UPDATE ON deals
+    REFERENCING OLD TABLE AS old_table NEW TABLE AS new_table
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_deal_changes();
+
+DROP TRIGGER IF EXISTS trigger_count_deal_deletes ON deals;
+CREATE TRIGGER trigger_count_deal_deletes
+    AFTER DELETE ON deals
+    REFERENCING OLD TABLE AS old_table
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_deal_changes();
+
+-- A deleted deal's matches are removed by ON DELETE CASCADE after the deal is gone, when
+-- their liveness can no longer be looked up, so they are counted out before the delete
+CREATE OR REPLACE FUNCTION count_deleted_deal_matches()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF OLD.is_live THEN
+        PERFORM add_deal_stats(
+            ARRAY['live_matches'],
+            ARRAY[-(SELECT COUNT(*) FROM search_matches WHERE deal_id = OLD.id)]
+        );
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_count_deleted_deal_matches ON deals;
+CREATE TRIGGER trigger_count_deleted_deal_matches
+    BEFORE DELETE ON deals
+    FOR EACH ROW
+    EXECUTE FUNCTION count_deleted_deal_matches();
+
+-- Matches are only inserted and deleted; their deal and term never change
+CREATE OR REPLACE FUNCTION count_search_match_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed BIGINT;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT COUNT(*) INTO changed
+        FROM new_table n JOIN deals d ON d.id = n.deal_id
+        WHERE d.is_live;
+    ELSE
+        SELECT -COUNT(*) INTO changed
+        FROM old_table o JOIN deals d ON d.id = o.deal_id
+        WHERE d.is_live;
+    END IF;
+
+    PERFORM add_deal_stats(ARRAY['live_matches'], ARRAY[changed]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_count_search_match_inserts ON search_matches;
+CREATE TRIGGER trigger_count_search_match_inserts
+    AFTER INSERT ON search_matches
+    REFERENCING NEW TABLE AS new_table
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_search_match_changes();
+
+DROP TRIGGER IF EXISTS trigger_count_search_match_deletes ON search_matches;
+CREATE TRIGGER trigger_count_search_match_deletes
+    AFTER DELETE ON search_matches
+    REFERENCING OLD TABLE AS old_table
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_search_match_changes();
+
+CREATE OR REPLACE FUNCTION count_search_term_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    added BIGINT := 0;
+    removed BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT COUNT(*) INTO added FROM new_table WHERE is_active;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        SELECT COUNT(*) INTO removed FROM old_table WHERE is_active;
+    END IF;
+
+    PERFORM add_deal_stats(ARRAY['active_search_terms'], ARRAY[added - removed]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_count_search_term_inserts ON search_terms;
+CREATE TRIGGER trigger_count_search_term_inserts
+    AFTER INSERT ON search_terms
+    REFERENCING NEW TABLE AS new_table
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_search_term_changes();
+
+DROP TRIGGER IF EXISTS trigger_count_search_term_updates ON search_terms;
+CREATE TRIGGER trigger_count_search_term_updates
+    AFTER UPDATE ON search_terms
+    REFERENCING OLD TABLE AS old_table NEW TABLE AS new_table
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_search_term_changes();
+
+DROP TRIGGER IF EXISTS trigger_count_search_term_deletes ON search_terms;
+CREATE TRIGGER trigger_count_search_term_deletes
+    AFTER DELETE ON search_terms
+    REFERENCING OLD TABLE AS old_table
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_search_term_changes();
+
+-- Recount every counter and correct the ones that drifted (concurrent writers racing on a
+-- deal's liveness, TRUNCATE, manual edits with triggers disabled). Writers are held off for
+-- the duration so no change lands between a count and its correction. Returns the number
+-- of counters corrected
+CREATE OR REPLACE FUNCTION reconcile_deal_stats()
+RETURNS INTEGER AS $$
+DECLARE
+    corrected INTEGER;
+BEGIN
+    LOCK TABLE deals, search_terms, search_matches IN SHARE MODE;
+
+    WITH deal_counts AS (
+        SELECT
+            COUNT(*) AS total_deals,
+            COUNT(*) FILTER (WHERE is_active) AS active_deals,
+            COUNT(*) FILTER (WHERE is_live) AS live_deals,
+            COUNT(*) FILTER (WHERE is_active AND NOT is_live) AS expired_deals,
+            COUNT(*) FILTER (WHERE expiry_date IS NOT NULL) AS dated_deals
+        FROM deals
+    ),
+    actual(name, value) AS (
+        SELECT counts.name, counts.value
+        FROM deal_counts,
+        LATERAL (VALUES
+            ('total_deals', total_deals),
+            ('active_deals', active_deals),
+            ('live_deals', live_deals),
+            ('expired_deals', expired_deals),
+            ('dated_deals', dated_deals)
+        ) AS counts(name, value)
+        UNION ALL
+        SELECT 'active_search_terms', COUNT(*) FROM search_terms WHERE is_active
+        UNION ALL
+        SELECT 'live_matches', COUNT(*)
+        FROM search_matches sm JOIN deals d ON d.id = sm.deal_id
+        WHERE d.is_live
+    ),
+    fixed AS (
+        INSERT INTO deal_stats (name, value, updated_at)
+        SELECT name, value, CURRENT_TIMESTAMP FROM actual
+        ON CONFLICT (name) DO UPDATE
+        SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at
+        WHERE deal_stats.value IS DISTINCT FROM EXCLUDED.value
+        RETURNING 1
+    )
+    SELECT COUNT(*) INTO corrected FROM fixed;
+
+    RETURN corrected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Seed the counters
+SELECT reconcile_deal_stats();
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('014_add_deal_stats', '014_deal_stats_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,167 @@
+-- Migration: Normalized stores with live deal counts
+-- Date: 2026-10-17
+-- Description: Adds a stores table referenced by deals.store_id, set by a trigger from deals.store,
+--              with each store's number of live deals kept current by statement-level triggers.
+--              The store filter dropdown reads stores directly and the deals page filters on
+--              store_id through a (store_id, created_at, id) index on live deals
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS stores (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL UNIQUE,
+    live_deals INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON COLUMN stores.live_deals IS 'Live deals from this store; maintained by triggers, see reconcile_store_deals()';
+
+ALTER TABLE deals ADD COLUMN IF NOT EXISTS store_id INTEGER REFERENCES stores(id);
+
+-- Backfill before the triggers exist
+INSERT INTO stores (name)
+SELECT DISTINCT store FROM deals WHERE store IS NOT NULL
+ON CONFLICT (name) DO NOTHING;
+
+UPDATE deals d SET store_id = s.id
+FROM stores s
+WHERE s.name = d.store AND d.store_id IS DISTINCT FROM s.id;
+
+CREATE OR REPLACE FUNCTION set_deal_store_id()
+RETURNS TRIGGER AS $$
+DECLARE
+    found_id INTEGER;
+BEGIN
+    IF NEW.store IS NULL THEN
+        NEW.store_id := NULL;
+        RETURN NEW;
+    END IF;
+
+    SELECT id INTO found_id FROM stores WHERE name = NEW.store;
+    IF found_id IS NULL THEN
+        INSERT INTO stores (name) VALUES (NEW.store) ON CONFLICT (name) DO NOTHING;
+        SELECT id INTO found_id FROM stores WHERE name = NEW.store;
+    END IF;
+
+    NEW.store_id := found_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_set_deal_store_id ON deals;
+CREATE TRIGGER trigger_set_deal_store_id
+    BEFORE INSERT OR UPDATE OF store ON deals
+    FOR EACH ROW
+    EXECUTE FUNCTION set_deal_store_id();
+
+CREATE OR REPLACE FUNCTION count_store_deal_changes()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE stores s
+        SET live_deals = s.live_deals + d.delta, updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT store_id, COUNT(*) AS delta FROM new_table
+            WHERE is_live AND store_id IS NOT NULL
+            GROUP BY store_id
+        ) d
+        WHERE s.id = d.store_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE stores s
+        SET live_deals = s.live_deals - d.delta, updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT store_id, COUNT(*) AS delta FROM old_table
+            WHERE is_live AND store_id IS NOT NULL
+            GROUP BY store_id
+        ) d
+        WHERE s.id = d.store_id;
+    ELSE
+        -- Only rows whose liveness or store changed move a count
+        UPDATE stores s
+        SET live_deals = s.live_deals + d.delta, updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT store_id, SUM(delta) AS delta
+            FROM (
+                SELECT n.store_id, 1 AS delta
+                FROM new_table n JOIN old_table o ON o.id = n.id
+                WHERE n.is_live AND n.store_id IS NOT NULL
+                AND (NOT o.is_live OR o.store_id IS DISTINCT FROM n.store_id)
+                UNION ALL
+                SELECT o.store_id, -1
+                FROM new_table n JOIN old_table o ON o.id = n.id
+                WHERE o.is_live AND o.store_id IS NOT NULL
+                AND (NOT n.is_live OR o.store_id IS DISTINCT FROM n.store_id)
+            ) changes
+            GROUP BY store_id
+        ) d
+        WHERE s.id = d.store_id AND d.delta <> 0;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_count_store_deal_inserts ON deals;
+CREATE TRIGGER trigger_count_store_deal_inserts
+    AFTER INSERT ON deals
+    REFERENCING NEW TABLE AS new_table
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_store_deal_changes();
+
+DROP TRIGGER IF EXISTS trigger_count_store_deal_updates ON deals;
+CREATE TRIGGER trigger_count_store_deal_updates
+    AFTER UPDATE ON deals
+    REFERENCING OLD TABLE AS old_table NEW TABLE AS new_table
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_store_deal_changes();
+
+DROP TRIGGER IF EXISTS trigger_count_store_deal_deletes ON deals;
+CREATE TRIGGER trigger_count_store_deal_deletes
+    AFTER DELETE ON deals
+    REFERENCING OLD TABLE AS old_table
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION count_store_deal_changes();
+
+-- Recount live deals per store and correct the stores that drifted; like
+-- reconcile_deal_stats(), writers are held off meanwhile. Returns the number corrected
+CREATE OR REPLACE FUNCTION reconcile_store_deals()
+RETURNS INTEGER AS $$
+DECLARE
+    corrected INTEGER;
+BEGIN
+    LOCK TABLE deals, stores IN SHARE MODE;
+
+    WITH actual AS (
+        SELECT s.id, COUNT(d.id) AS live_deals
+        FROM stores s
+        LEFT JOIN deals d ON d.store_id = s.id AND d.is_live
+        GROUP BY s.id
+    ),
+    fixed AS (
+        UPDATE stores s
+        SET live_deals = actual.live_deals, updated_at = CURRENT_TIMESTAMP
+        FROM actual
+        WHERE s.id = actual.id AND s.live_deals <> actual.live_deals
+        RETURNING 1
+    )
+    SELECT COUNT(*) INTO corrected FROM fixed;
+
+    RETURN corrected;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Seed the counts
+SELECT reconcile_store_deals();
+
+-- Live deals of one store, newest first, for the filtered deals page
+CREATE INDEX IF NOT EXISTS idx_deals_live_store_id ON deals(store_id, created_at DESC, id DESC) WHERE is_live;
+
+-- The store filter no longer matches on the name
+DROP INDEX IF EXISTS idx_deals_live_store;
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('015_add_stores', '015_stores_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,77 @@
+-- Migration: Data version for web response caching
+-- Date: 2026-10-17
+-- Description: Adds data_versions with a 'data' counter bumped once per transaction that changes
+--              deals, search matches or search terms, announced with NOTIFY data_changed so the
+--              web app can key its caches on it and serve pages without queries in between
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    -- Transaction that last bumped the version, so a transaction bumps it only once
+    bumped_by BIGINT,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO data_versions (name) VALUES ('data') ON CONFLICT (name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_data_version()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed BOOLEAN;
+    new_version BIGINT;
+BEGIN
+    -- Statements that touched no rows (empty upserts, idle sweeps) change nothing
+    IF TG_OP = 'DELETE' THEN
+        SELECT EXISTS (SELECT 1 FROM old_table) INTO changed;
+    ELSE
+        SELECT EXISTS (SELECT 1 FROM new_table) INTO changed;
+    END IF;
+
+    IF changed THEN
+        UPDATE data_versions
+        SET version = version + 1, bumped_by = txid_current(), updated_at = CURRENT_TIMESTAMP
+        WHERE name = 'data' AND bumped_by IS DISTINCT FROM txid_current()
+        RETURNING version INTO new_version;
+
+        -- Delivered on commit, in commit order
+        IF new_version IS NOT NULL THEN
+            PERFORM pg_notify('data_changed', new_version::text);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger
+DO $$
+DECLARE
+    table_name TEXT;
+BEGIN
+    FOREACH table_name IN ARRAY ARRAY['deals', 'search_matches', 'search_terms'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trigger_data_version_inserts ON %I', table_name);
+        EXECUTE format('CREATE TRIGGER trigger_data_version_inserts AFTER INSERT ON %I '
+                       'REFERENCING NEW TABLE AS new_table FOR EACH STATEMENT '
+                       'EXECUTE FUNCTION bump_data_version()', table_name);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trigger_data_version_updates ON %I', table_name);
+        EXECUTE format('CREATE TRIGGER trigger_data_version_updates AFTER UPDATE ON %I '
+                       'REFERENCING NEW TABLE AS new_table FOR EACH STATEMENT '
+                       'EXECUTE FUNCTION bump_data_version()', table_name);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trigger_data_version_deletes ON %I', table_name);
+        EXECUTE format('CREATE TRIGGER trigger_data_version_deletes AFTER DELETE ON %I '
+                       'REFERENCING OLD TABLE AS old_table FOR EACH STATEMENT '
+                       'EXECUTE FUNCTION bump_data_version()', table_name);
+    END LOOP;
+END;
+$$;
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('016_add_data_versions', '016_data_versions_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,43 @@
+-- Migration: Adaptive revisits for expired deal checks
+-- Date: 2026-10-17
+-- Description: Adds deals.next_check_at, set by the expired checker's revisit policy from each deal's
+--              age, votes, store and category expiry rates and when it was last found active
+--              (last_active_at). The checker picks due deals through a next_check_at index
+--              instead of a flat hours-since-check cutoff
+
+BEGIN;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'deals' AND column_name = 'next_check_at'
+    ) THEN
+        ALTER TABLE deals ADD COLUMN last_active_at TIMESTAMP;
+        -- New deals are due straight away; the policy ranks them against older ones
+        ALTER TABLE deals ADD COLUMN next_check_at TIMESTAMP DEFAULT LOCALTIMESTAMP;
+
+        -- Carry over the previous schedule: a day after the last check, oldest unchecked deals first
+        UPDATE deals
+        SET last_active_at = last_checked,
+            next_check_at = COALESCE(last_checked + INTERVAL '1 day', created_at, next_check_at)
+        WHERE expiry_date IS NULL;
+    END IF;
+END;
+$$;
+
+COMMENT ON COLUMN deals.next_check_at IS 'When the expired checker should next check this deal, while expiry_date is NULL';
+COMMENT ON COLUMN deals.last_active_at IS 'When the expired checker last found this deal active';
+
+-- Unexpired deals, soonest due first
+CREATE INDEX IF NOT EXISTS idx_deals_next_check_at ON deals(next_check_at) WHERE expiry_date IS NULL;
+
+-- Candidates are no longer picked by last_checked
+DROP INDEX IF EXISTS idx_deals_expiry_status;
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('017_add_expiry_revisits', '017_expiry_revisits_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
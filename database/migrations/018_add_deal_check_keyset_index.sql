@@ -0,0 +1,18 @@
+-- Migration: Keyset index for expiry check candidates
+-- Date: 2026-10-17
+-- Description: Replaces the next_check_at index with one on (next_check_at, id) so the expired
+--              checker can stream candidates in chunks, seeking past the last (next_check_at, id)
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_deals_next_check_at_id ON deals(next_check_at, id) WHERE expiry_date IS NULL;
+
+-- Covered by the index above
+DROP INDEX IF EXISTS idx_deals_next_check_at;
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('018_add_deal_check_keyset_index', '018_deal_check_keyset_index_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,45 @@
+-- Migration: Content change time for continuous matching
+-- Date: 2026-10-17
+-- Description: Adds deals.content_changed_at, set when a deal is inserted or its scraped content
+--              (content_hash) changes, and moves the matcher watermark and the deals_changed
+--              notification onto it. updated_at moves on every write, including the expired
+--              checker's bookkeeping and expiry sweeps, which sent unchanged deals back through matching
+
+BEGIN;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'deals' AND column_name = 'content_changed_at'
+    ) THEN
+        ALTER TABLE deals ADD COLUMN content_changed_at TIMESTAMP;
+
+        -- Deals up to the watermark keep the position they were matched at
+        UPDATE deals SET content_changed_at = updated_at;
+
+        ALTER TABLE deals ALTER COLUMN content_changed_at SET DEFAULT CURRENT_TIMESTAMP;
+    END IF;
+END;
+$$;
+
+COMMENT ON COLUMN deals.content_changed_at IS 'When the deal was inserted or its content_hash last changed';
+COMMENT ON COLUMN matcher_watermarks.last_updated_at IS 'deals.content_changed_at of the last deal matched';
+
+-- Walking deals in watermark order
+CREATE INDEX IF NOT EXISTS idx_deals_content_changed_at_id ON deals(content_changed_at, id);
+DROP INDEX IF EXISTS idx_deals_updated_at_id;
+
+-- Wake the matcher for new and changed deals only
+DROP TRIGGER IF EXISTS trigger_notify_deals_changed ON deals;
+CREATE TRIGGER trigger_notify_deals_changed
+    AFTER INSERT OR UPDATE OF content_changed_at ON deals
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_deals_changed();
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('019_add_deal_content_changed_at', '019_deal_content_changed_at_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
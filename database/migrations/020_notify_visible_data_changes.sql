@@ -0,0 +1,87 @@
+-- Migration: Notify web caches of visible changes only
+-- Date: 2026-10-17
+-- Description: Replaces the data_versions counter with a data_changed notification sent only for
+--              changes the web views can show: deals inserted or deleted, deal content, liveness
+--              or expiry changes, and search match and search term writes. Expiry check
+--              bookkeeping no longer invalidates the web caches, and writers no longer queue on
+--              the single data_versions row. The web app advances its own version per notification
+
+BEGIN;
+
+DO $$
+DECLARE
+    table_name TEXT;
+BEGIN
+    FOREACH table_name IN ARRAY ARRAY['deals', 'search_matches', 'search_terms'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trigger_data_version_inserts ON %I', table_name);
+        EXECUTE format('DROP TRIGGER IF EXISTS trigger_data_version_updates ON %I', table_name);
+        EXECUTE format('DROP TRIGGER IF EXISTS trigger_data_version_deletes ON %I', table_name);
+    END LOOP;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS bump_data_version();
+DROP TABLE IF EXISTS data_versions;
+
+CREATE OR REPLACE FUNCTION notify_data_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed BOOLEAN;
+BEGIN
+    -- Statements that touched no rows (empty upserts, idle sweeps) change nothing
+    IF TG_OP = 'DELETE' THEN
+        SELECT EXISTS (SELECT 1 FROM old_table) INTO changed;
+    ELSIF TG_OP = 'UPDATE' AND TG_TABLE_NAME = 'deals' THEN
+        -- last_checked, next_check_at and last_active_at are not shown anywhere
+        SELECT EXISTS (
+            SELECT 1
+            FROM new_table n
+            JOIN old_table o ON o.id = n.id
+            WHERE n.content_changed_at IS DISTINCT FROM o.content_changed_at
+            OR n.is_live IS DISTINCT FROM o.is_live
+            OR n.is_active IS DISTINCT FROM o.is_active
+            OR n.expiry_date IS DISTINCT FROM o.expiry_date
+        ) INTO changed;
+    ELSE
+        SELECT EXISTS (SELECT 1 FROM new_table) INTO changed;
+    END IF;
+
+    IF changed THEN
+        -- Identical notifications fold into one per transaction, delivered on commit
+        PERFORM pg_notify('data_changed', '');
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger
+DO $$
+DECLARE
+    table_name TEXT;
+BEGIN
+    FOREACH table_name IN ARRAY ARRAY['deals', 'search_matches', 'search_terms'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trigger_notify_data_inserts ON %I', table_name);
+        EXECUTE format('CREATE TRIGGER trigger_notify_data_inserts AFTER INSERT ON %I '
+                       'REFERENCING NEW TABLE AS new_table FOR EACH STATEMENT '
+                       'EXECUTE FUNCTION notify_data_changed()', table_name);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trigger_notify_data_updates ON %I', table_name);
+        EXECUTE format('CREATE TRIGGER trigger_notify_data_updates AFTER UPDATE ON %I '
+                       'REFERENCING OLD TABLE AS old_table NEW TABLE AS new_table FOR EACH STATEMENT '
+                       'EXECUTE FUNCTION notify_data_changed()', table_name);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trigger_notify_data_deletes ON %I', table_name);
+        EXECUTE format('CREATE TRIGGER trigger_notify_data_deletes AFTER DELETE ON %I '
+                       'REFERENCING OLD TABLE AS old_table FOR EACH STATEMENT '
+                       'EXECUTE FUNCTION notify_data_changed()', table_name);
+    END LOOP;
+END;
+$$;
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('020_notify_visible_data_changes', '020_notify_visible_data_changes_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,19 @@
+-- Migration: Back off expiry checks that keep failing
+-- Date: 2026-10-17
+-- Description: Adds deals.check_failures, the expired checker's inconclusive results (timeouts,
+--              network and HTTP errors) since it last reached a verdict on the deal. Each one
+--              reschedules next_check_at twice as far out as the last, so an unreachable deal is
+--              no longer picked up again by every run
+
+BEGIN;
+
+ALTER TABLE deals ADD COLUMN IF NOT EXISTS check_failures INTEGER NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN deals.check_failures IS 'Inconclusive expiry checks since the last verdict; backs off next_check_at';
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('021_add_deal_check_failures', '021_deal_check_failures_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,71 @@
+-- Migration: Rematch deals only when the fields matching reads change
+-- Date: 2026-10-17
+-- Description: Adds deals.match_hash, a fingerprint of title, description and store, and moves
+--              content_changed_at (the matcher watermark) only when it changes. content_hash also
+--              covers votes and comments, which change on most scrapes of a live deal, and missed
+--              store changes that matching scores on. Votes, price and comment changes still reach
+--              the web caches: data_changed now also follows content_hash
+
+BEGIN;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'deals' AND column_name = 'match_hash'
+    ) THEN
+        ALTER TABLE deals ADD COLUMN match_hash VARCHAR(64);
+
+        -- Same fingerprint as match_fingerprint() in shared/database.py, so the next scrape
+        -- of an unchanged deal does not send it back through matching
+        UPDATE deals
+        SET match_hash = encode(sha256(convert_to(
+            COALESCE(title, '') || E'\x1f' || COALESCE(description, '') || E'\x1f' || COALESCE(store, ''),
+            'UTF8'
+        )), 'hex');
+    END IF;
+END;
+$$;
+
+COMMENT ON COLUMN deals.match_hash IS 'SHA-256 of title, description and store, the fields search terms are scored on';
+COMMENT ON COLUMN deals.content_changed_at IS 'When the deal was inserted or its match_hash last changed';
+
+CREATE OR REPLACE FUNCTION notify_data_changed()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed BOOLEAN;
+BEGIN
+    -- Statements that touched no rows (empty upserts, idle sweeps) change nothing
+    IF TG_OP = 'DELETE' THEN
+        SELECT EXISTS (SELECT 1 FROM old_table) INTO changed;
+    ELSIF TG_OP = 'UPDATE' AND TG_TABLE_NAME = 'deals' THEN
+        -- last_checked, next_check_at and last_active_at are not shown anywhere
+        SELECT EXISTS (
+            SELECT 1
+            FROM new_table n
+            JOIN old_table o ON o.id = n.id
+            WHERE n.content_hash IS DISTINCT FROM o.content_hash
+            OR n.content_changed_at IS DISTINCT FROM o.content_changed_at
+            OR n.is_live IS DISTINCT FROM o.is_live
+            OR n.is_active IS DISTINCT FROM o.is_active
+            OR n.expiry_date IS DISTINCT FROM o.expiry_date
+        ) INTO changed;
+    ELSE
+        SELECT EXISTS (SELECT 1 FROM new_table) INTO changed;
+    END IF;
+
+    IF changed THEN
+        -- Identical notifications fold into one per transaction, delivered on commit
+        PERFORM pg_notify('data_changed', '');
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Record migration
+INSERT INTO schema_migrations (migration_name, checksum) 
+VALUES ('022_add_deal_match_hash', '022_deal_match_hash_v1') 
+ON CONFLICT (migration_name) DO NOTHING;
+
+COMMIT;
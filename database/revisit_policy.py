@@ -0,0 +1,120 @@
+"""
+Revisit Policy for Expired Deal Checks
+Decides when each unexpired deal is next worth checking, and which due deals
+a run with a limited request budget should check first.
+
+Deals are modelled as a mix of ones that will expire and ones that never do.
+The share that expire is the rate at which checks have found deals from the
+same store and category expired. Those that expire do so with a hazard that
+falls with age, k / (age + L) per hour, where k grows with the deal's votes
+(popular deals sell out). Given when a deal was last seen active, that gives
+the chance it has expired since: fresh deals from stores whose deals often
+expire come up within hours, while a deal that has lasted weeks is most
+likely one that never expires and is left for days.
+"""
+
+import math
+from datetime import datetime, timedelta
+
+
+class RevisitPolicy:
+    def __init__(self, lifetime_hours=24.0, check_probability=0.05, min_interval_hours=1.0,
+                 max_interval_hours=24.0 * 7, default_expiry_rate=0.2, prior_weight=20):
+        # Age in hours by which half of the deals that expire have expired
+        self.lifetime_hours = lifetime_hours
+        # A deal is due once the chance it expired since last seen active reaches this
+        self.check_probability = check_probability
+        self.min_interval_hours = min_interval_hours
+        self.max_interval_hours = max_interval_hours
+        self.default_expiry_rate = default_expiry_rate
+        # Checked deals' worth of the overall rate blended into each store and category rate
+        self.prior_weight = prior_weight
+        self.overall_rate = default_expiry_rate
+        self.store_rates = {}
+        self.category_rates = {}
+
+    def load_expiry_rates(self, rows):
+        """Take (store_id, category, expired, checked) counts, grouped by store, by category and overall.
+
+        Rows for a store have category None, rows for a category have store_id
+        None, and the overall row has both None.
+        """
+        self.overall_rate = self.default_expiry_rate
+        self.store_rates = {}
+        self.category_rates = {}
+
+        for store_id, category, expired, checked in rows:
+            if store_id is None and category is None and checked:
+                self.overall_rate = expired / checked
+
+        for store_id, category, expired, checked in rows:
+            rate = (expired + self.prior_weight * self.overall_rate) / (checked + self.prior_weight)
+            if store_id is not None:
+                self.store_rates[store_id] = rate
+            elif category is not None:
+                self.category_rates[category] = rate
+
+    def expiry_rate(self, deal):
+        """Share of deals like this one that expire at all"""
+        rates = [
+            rate for rate in (self.store_rates.get(deal.get('store_id')), self.category_rates.get(deal.get('category')))
+            if rate is not None
+        ]
+        rate = sum(rates) / len(rates) if rates else self.overall_rate
+        return min(max(rate, 0.01), 0.99)
+
+    def _hazard_scale(self, deal):
+        return 1 + math.log1p(max(deal.get('votes') or 0, 0)) / 4
+
+    def _survival(self, age_hours, scale):
+        """Chance a deal that will expire has not yet at age_hours"""
+        return (self.lifetime_hours / (age_hours + self.lifetime_hours)) ** scale
+
+    def _age_hours(self, deal, at):
+        return max((at - deal['created_at']).total_seconds() / 3600, 0)
+
+    def expiry_probability(self, deal, at=None):
+        """Chance the deal has expired between when it was last seen active and at"""
+        at = at or datetime.now()
+        rate = self.expiry_rate(deal)
+        scale = self._hazard_scale(deal)
+
+        seen_age = self._age_hours(deal, deal.get('last_active_at') or deal['created_at'])
+        age = max(self._age_hours(deal, at), seen_age)
+        seen_survival = self._survival(seen_age, scale)
+
+        return rate * (seen_survival - self._survival(age, scale)) / (rate * seen_survival + 1 - rate)
+
+    def next_check_at(self, deal, checked_at):
+        """When to check a deal again after checked_at found it active"""
+        rate = self.expiry_rate(deal)
+        scale = self._hazard_scale(deal)
+        age = self._age_hours(deal, checked_at)
+        seen_survival = self._survival(age, scale)
+
+        # Survival of expiring deals at which the expiry probability reaches check_probability
+        target = seen_survival - self.check_probability * (rate * seen_survival + 1 - rate) / rate
+        if target <= 0:
+            # Most likely a deal that never expires
+            interval = self.max_interval_hours
+        else:
+            interval = self.lifetime_hours * target ** (-1 / scale) - self.lifetime_hours - age
+            interval = min(max(interval, self.min_interval_hours), self.max_interval_hours)
+
+        return checked_at + timedelta(hours=interval)
+
+    def retry_at(self, deal, checked_at):
+        """When to try again after checked_at's check of a deal was inconclusive.
+
+        Each inconclusive check in a row (the deal's check_failures before this
+        one) doubles the wait, from min_interval_hours up to max_interval_hours.
+        """
+        failures = min(deal.get('check_failures') or 0, 32)
+        interval = min(self.min_interval_hours * 2 ** failures, self.max_interval_hours)
+        return checked_at + timedelta(hours=interval)
+
+    def select(self, deals, budget, at=None):
+        """The budget deals most likely to have expired, most likely first"""
+        at = at or datetime.now()
+        ranked = sorted(deals, key=lambda deal: self.expiry_probability(deal, at), reverse=True)
+        return ranked if budget is None else ranked[:budget]
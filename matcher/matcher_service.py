@@ -1,9 +1,14 @@
 import os
 import time
+import select
+import socket
 import logging
-from datetime import datetime, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from dotenv import load_dotenv
-from database import MatcherDatabaseManager
+from database import MatcherDatabaseManager, SearchTermCache
+from percolator import Percolator
 
 # Load environment variables
 load_dotenv()
@@ -15,11 +20,70 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Channel notified by the matching_jobs trigger (migration 008)
+MATCHING_JOBS_CHANNEL = 'matching_jobs'
+# Channel notified whenever deals are inserted or their content changes (migrations 010, 019)
+DEALS_CHANGED_CHANNEL = 'deals_changed'
+# Watermark row tracking continuous matching of deals
+DEALS_WATERMARK = 'deals'
+
+class LeaseHeartbeat:
+    """Renews this worker's leases on claimed jobs while they run.
+    
+    Leases are extended every third of lease_seconds, so a job that runs
+    longer than its lease is not reclaimed and run again by another worker.
+    """
+    
+    def __init__(self, db, worker_id, job_ids, lease_seconds):
+        self.db = db
+        self.worker_id = worker_id
+        self.job_ids = set(job_ids)
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+    
+    def run(self):
+        while self.job_ids and not self.stopped.wait(self.lease_seconds / 3):
+            try:
+                held = self.db.renew_leases(self.worker_id, self.job_ids, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Error renewing job leases: {e}")
+                continue
+            
+            # Finished jobs drop out too; only report those taken over by another worker
+            lost = self.job_ids - held
+            self.job_ids = held
+            if lost:
+                logger.debug(f"No longer holding leases on jobs {sorted(lost)}")
+
 class MatcherService:
-    def __init__(self, database_url):
+    def __init__(self, database_url, workers=1, lease_seconds=600, batch_size=0, watermark_lag=60):
         self.db = MatcherDatabaseManager(database_url)
-        self.check_interval = 30  # Check for jobs every 30 seconds
+        self.check_interval = 30  # Back-off after errors before reconnecting
         self.running = True
+        self.listen_connection = None
+        # Jobs processed concurrently by this process
+        self.workers = max(1, workers)
+        # How long a claimed job stays ours before other replicas may reclaim it
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        # When above 1, due jobs are claimed up to this many at a time and
+        # matched together in one pass over deals
+        self.batch_size = batch_size
+        # Continuous matching of new and changed deals
+        self.search_terms = SearchTermCache(self.db)
+        self.percolator = Percolator()
+        self.percolator_version = None
+        self.watermark_lag = watermark_lag
+        self.deals_page_size = 500
         
     def start(self):
         """Start the matcher service"""
@@ -27,42 +91,171 @@ class MatcherService:
         
         while self.running:
             try:
-                self.process_pending_jobs()
-                time.sleep(self.check_interval)
+                self.listen_connection = self.db.listen(MATCHING_JOBS_CHANNEL, DEALS_CHANGED_CHANNEL)
+                logger.info(f"Listening on channels '{MATCHING_JOBS_CHANNEL}' and '{DEALS_CHANGED_CHANNEL}'")
+                
+                while self.running:
+                    self.process_pending_jobs()
+                    self.match_changed_deals()
+                    self.wait_for_jobs()
             except KeyboardInterrupt:
                 logger.info("Shutting down matcher service")
                 self.running = False
             except Exception as e:
                 logger.error(f"Error in matcher service: {e}")
                 time.sleep(self.check_interval)
+            finally:
+                self.close_listener()
     
-    def process_pending_jobs(self):
-        """Process all pending matching jobs"""
+    def wait_for_jobs(self):
+        """Block until a job notification arrives or the next scheduled job is due.
+        
+        While idle the service sits in select() on the LISTEN connection and
+        makes no queries; a timer covers jobs scheduled in the future.
+        """
+        delay = self.db.get_seconds_until_next_job()
+        
+        if delay is None:
+            timeout = None  # Nothing scheduled, wait for a notification
+        elif delay > 0:
+            timeout = delay
+        else:
+            # Jobs are still due right after processing them; don't spin
+            timeout = 1.0
+        
+        ready, _, _ = select.select([self.listen_connection], [], [], timeout)
+        if ready:
+            self.listen_connection.poll()
+            channels = {notify.channel for notify in self.listen_connection.notifies}
+            self.listen_connection.notifies.clear()
+            logger.debug(f"Woken by notifications on: {sorted(channels)}")
+    
+    def match_changed_deals(self):
+        """Match deals inserted or changed since the watermark against all active terms.
+        
+        Each cycle only reads deals past the (content_changed_at, id) watermark,
+        so its cost follows new data rather than the size of the deals table.
+        Deals whose title, description or store changed after first ingest are
+        rematched the same way; other writes, such as vote counts, do not move them.
+        """
         try:
-            pending_jobs = self.db.get_pending_jobs()
+            watermark = self.db.get_watermark(DEALS_WATERMARK) or (datetime.min, 0)
+            position = watermark
+            matches_created = 0
+            deals_seen = 0
             
-            if not pending_jobs:
-                return
+            while self.running:
+                deals = self.db.get_deals_changed_since(*position, limit=self.deals_page_size)
+                if not deals:
+                    break
+                
+                search_terms = self.search_terms.get()
+                # Recompile the percolator only when the term snapshot changed
+                if self.percolator_version != self.search_terms.version:
+                    self.percolator.sync((search_term.id, search_term.term) for search_term in search_terms)
+                    self.percolator_version = self.search_terms.version
+                
+                matches = []
+                for deal in deals:
+                    for search_term_id, match_score in self.percolator.match(deal.title, deal.description, deal.store):
+                        matches.append((deal.id, search_term_id, match_score))
+                
+                matches_created += self.db.save_search_matches_bulk(matches)
+                deals_seen += len(deals)
+                position = (deals[-1].content_changed_at, deals[-1].id)
+                
+                if len(deals) < self.deals_page_size:
+                    break
             
-            logger.info(f"Found {len(pending_jobs)} pending matching jobs")
+            if position != watermark:
+                self.db.save_watermark(DEALS_WATERMARK, *position, lag_seconds=self.watermark_lag)
             
-            for job in pending_jobs:
-                try:
-                    self.process_job(job)
-                except Exception as e:
-                    logger.error(f"Error processing job {job.id}: {e}")
-                    self.db.mark_job_as_failed(job.id, str(e))
+            if matches_created:
+                logger.info(f"Matched {deals_seen} new or changed deals: created {matches_created} matches")
+                
+        except Exception as e:
+            logger.error(f"Error matching changed deals: {e}")
+    
+    def close_listener(self):
+        """Close the LISTEN connection if it is open"""
+        if self.listen_connection is not None:
+            try:
+                self.listen_connection.close()
+            except Exception:
+                pass
+            self.listen_connection = None
+    
+    def process_pending_jobs(self):
+        """Claim and process due matching jobs until none are left"""
+        if self.batch_size > 1:
+            self.process_pending_jobs_in_batches()
+            return
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                while self.running:
+                    # Claiming marks the jobs as running under our lease
+                    jobs = self.db.claim_jobs(self.worker_id, limit=self.workers, lease_seconds=self.lease_seconds)
+                    
+                    if not jobs:
+                        return
                     
+                    logger.info(f"Claimed {len(jobs)} pending matching jobs")
+                    with LeaseHeartbeat(self.db, self.worker_id, [job.id for job in jobs], self.lease_seconds):
+                        list(executor.map(self.run_job, jobs))
+                    
+        except Exception as e:
+            logger.error(f"Error claiming pending jobs: {e}")
+    
+    def process_pending_jobs_in_batches(self):
+        """Claim due jobs in batches and match each batch in a single pass"""
+        try:
+            while self.running:
+                jobs = self.db.claim_jobs(self.worker_id, limit=self.batch_size, lease_seconds=self.lease_seconds)
+                
+                if not jobs:
+                    return
+                
+                logger.info(f"Claimed a batch of {len(jobs)} pending matching jobs")
+                with LeaseHeartbeat(self.db, self.worker_id, [job.id for job in jobs], self.lease_seconds):
+                    self.process_batch(jobs)
+                
+        except Exception as e:
+            logger.error(f"Error claiming pending jobs: {e}")
+    
+    def process_batch(self, jobs):
+        """Run a batch of claimed jobs, falling back to one job at a time on error"""
+        try:
+            outcomes = self.db.run_matching_batch(jobs, self.worker_id)
+        except Exception as e:
+            logger.error(f"Batched matching failed, retrying {len(jobs)} jobs individually: {e}")
+            for job in jobs:
+                self.run_job(job)
+            return
+        
+        for job in jobs:
+            status, matches_created, error_message = outcomes[job.id]
+            if status == 'completed':
+                logger.info(f"Completed matching job {job.id}: created {matches_created} matches for search term {job.search_term_id}")
+            else:
+                logger.error(f"Matching job {job.id} failed: {error_message}")
+    
+    def run_job(self, job):
+        """Process a claimed job, recording failures against it"""
+        try:
+            self.process_job(job)
         except Exception as e:
-            logger.error(f"Error getting pending jobs: {e}")
+            logger.error(f"Error processing job {job.id}: {e}")
+            try:
+                self.db.mark_job_as_failed(job.id, self.worker_id, str(e))
+            except Exception:
+                # The lease will expire and another worker will retry the job
+                pass
     
     def process_job(self, job):
         """Process a single matching job"""
         logger.info(f"Processing matching job {job.id} for search term {job.search_term_id}")
         
-        # Mark job as running
-        self.db.mark_job_as_running(job.id)
-        
         # Get search term details
         search_term = self.db.get_search_term(job.search_term_id)
         if not search_term:
@@ -70,14 +263,16 @@ class MatcherService:
         
         if not search_term.is_active:
             logger.info(f"Search term '{search_term.term}' is not active, skipping job")
-            self.db.mark_job_as_completed(job.id)
+            self.db.mark_job_as_completed(job.id, self.worker_id)
             return
         
         # Run the matching
         matches_created = self.db.run_matching_for_search_term(job.search_term_id)
         
-        # Mark job as completed
-        self.db.mark_job_as_completed(job.id)
+        # Mark job as completed, unless another worker has taken it over
+        if not self.db.mark_job_as_completed(job.id, self.worker_id):
+            logger.warning(f"Lost the lease on matching job {job.id} before it completed")
+            return
         
         logger.info(f"Completed matching job {job.id}: created {matches_created} matches for search term '{search_term.term}'")
     
@@ -116,7 +311,13 @@ def main():
                 time.sleep(2)
         
         # Initialize and start the matcher service
-        matcher = MatcherService(database_url)
+        matcher = MatcherService(
+            database_url,
+            workers=int(os.getenv('MATCHER_WORKERS', 1)),
+            lease_seconds=int(os.getenv('MATCHER_LEASE_SECONDS', 600)),
+            batch_size=int(os.getenv('MATCHER_BATCH_SIZE', 0)),
+            watermark_lag=int(os.getenv('MATCHER_WATERMARK_LAG', 60))
+        )
         
         # Run cleanup on startup
         matcher.cleanup_old_jobs()
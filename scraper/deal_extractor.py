@@ -0,0 +1,131 @@
+"""
+OzBargain Monitor - Deal Extraction
+
+Turns RSS feed entries into DealRecord objects. Every pattern is compiled once
+when the extractor is built, so extracting an entry costs a few regex searches
+and no per-entry setup.
+"""
+
+import re
+import logging
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from typing import Optional
+from dateutil import parser as date_parser
+
+logger = logging.getLogger(__name__)
+
+# Dates such as 25/07/2025 or 1-8-25
+DATE_PATTERN = r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})'
+
+
+@dataclass(slots=True)
+class DealRecord:
+    """A deal as extracted from a feed entry, ready to be stored"""
+    title: str
+    url: str
+    description: str = ''
+    price: Optional[float] = None
+    original_price: Optional[float] = None
+    discount_percentage: Optional[int] = None
+    store: Optional[str] = None
+    category: Optional[str] = None
+    votes: int = 0
+    comments_count: int = 0
+    deal_date: Optional[datetime] = None
+    expiry_date: Optional[datetime] = None
+    is_active: bool = True
+
+    def as_dict(self):
+        """Column values for the deals table"""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+
+class DealExtractor:
+    """Reusable extractor for OzBargain RSS entries"""
+
+    def __init__(self):
+        # One alternation instead of four separate expiry searches; the
+        # leftmost expiry phrase in the text wins
+        self.expiry_pattern = re.compile(
+            r'(?:valid\s+until|expires?|until|ends?)\s+' + DATE_PATTERN,
+            re.IGNORECASE
+        )
+        self.price_pattern = re.compile(r'\$(\d+(?:\.\d{2})?)')
+        self.discount_pattern = re.compile(r'(\d+)%\s*off', re.IGNORECASE)
+        # Store name often follows "at" or "@" in the title
+        self.store_pattern = re.compile(r'(?:at|@)\s*([A-Za-z0-9\s]+)', re.IGNORECASE)
+
+    def extract(self, entry):
+        """Extract a DealRecord from a feedparser entry, or None on failure"""
+        try:
+            title = entry.title
+            description = entry.get('summary', '')
+
+            record = DealRecord(title=title, url=entry.link, description=description)
+
+            # A date that fails to parse is dropped, not the whole entry
+            record.deal_date = self._parse_date(entry.get('published'))
+            record.expiry_date = self._extract_expiry(title, description)
+
+            price_match = self.price_pattern.search(title)
+            if price_match:
+                record.price = float(price_match.group(1))
+
+            discount_match = self.discount_pattern.search(title)
+            if discount_match:
+                record.discount_percentage = int(discount_match.group(1))
+
+            store_match = self.store_pattern.search(title)
+            if store_match:
+                record.store = store_match.group(1).strip()
+
+            # First tag carries the category
+            for tag in entry.get('tags') or ():
+                term = tag.get('term')
+                if term is not None:
+                    record.category = term
+                    break
+
+            # OzBargain RSS sometimes includes extra elements
+            record.votes = self._to_int(entry.get('votes'))
+            record.comments_count = self._to_int(entry.get('comments'))
+
+            return record
+
+        except Exception as e:
+            logger.error(f"Error extracting deal from entry: {e}")
+            return None
+
+    def _extract_expiry(self, title, description):
+        """Work out an expiry date from the title/description text"""
+        # Deals marked as expired in the title get a past expiry date
+        if 'expired' in title.lower():
+            return datetime.utcnow() - timedelta(days=1)
+
+        # Look for patterns like "expires 25/07/2025", "until 31/12/25", etc.
+        for match in self.expiry_pattern.finditer(f"{title} {description}"):
+            expiry_date = self._parse_date(match.group(1))
+            if expiry_date is not None:
+                return expiry_date
+        return None
+
+    @staticmethod
+    def _parse_date(value):
+        """Parse a date string, or None if it is missing or unparseable"""
+        if not value:
+            return None
+        try:
+            return date_parser.parse(value)
+        except Exception as e:
+            logger.debug(f"Ignoring unparseable date {value!r}: {e}")
+            return None
+
+    @staticmethod
+    def _to_int(value):
+        if value is None:
+            return 0
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return 0
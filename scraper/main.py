@@ -62,12 +62,24 @@ def initialize_services():
             time.sleep(2)
     
     # Initialize scraper
-    scraper = OzBargainScraper(db_manager)
+    scraper = OzBargainScraper(
+        db_manager,
+        max_workers=int(os.getenv('SCRAPE_WORKERS', 4)),
+        requests_per_second=float(os.getenv('SCRAPE_RATE_LIMIT', 0.5)),
+        burst=int(os.getenv('SCRAPE_RATE_BURST', 2)),
+        request_timeout=int(os.getenv('SCRAPE_TIMEOUT', 30))
+    )
     logger.info("Scraper initialized successfully")
     
     # Initialize expired deal checker if available
     if ExpiredDealChecker:
-        expired_checker = ExpiredDealChecker(database_url)
+        expired_checker = ExpiredDealChecker(
+            database_url,
+            max_workers=int(os.getenv('EXPIRY_CHECK_WORKERS', 16)),
+            per_host_concurrency=int(os.getenv('EXPIRY_CHECK_HOST_CONCURRENCY', 4)),
+            requests_per_second=float(os.getenv('EXPIRY_CHECK_RATE_LIMIT', 2)),
+            burst=int(os.getenv('EXPIRY_CHECK_RATE_BURST', 4))
+        )
         logger.info("Expired deal checker initialized successfully")
     else:
         logger.warning("ExpiredDealChecker not available - expired checking disabled")
@@ -76,6 +88,7 @@ def run_scraping_job():
     """Run the scraping job"""
     try:
         logger.info("Starting scheduled scraping job")
+        scraper.start_cycle()
         
         # Scrape main RSS feed
         main_feed_url = os.getenv('RSS_FEED_URL', 'https://www.ozbargain.com.au/deals/feed')
@@ -99,7 +112,7 @@ def run_expired_check_job():
         logger.info("Starting expired deal check job")
         
         # Check up to 50 deals per run, focusing on deals not checked in last 24 hours
-        results = expired_checker.run_expiry_check(limit=50, hours_since_check=24)
+        results = expired_checker.run_expiry_check(limit=int(os.getenv('EXPIRY_CHECK_LIMIT', 2000)))
         
         if results:
             expired_count = sum(1 for r in results if r['is_expired'])
@@ -111,6 +124,24 @@ def run_expired_check_job():
     except Exception as e:
         logger.error(f"Error in expired deal check job: {e}")
 
+def run_expiry_sweep_job():
+    """Take deals whose expiry date has passed out of the live set"""
+    try:
+        swept = db_manager.sweep_expired_deals()
+        if swept:
+            logger.info(f"Expiry sweep: {swept} deals passed their expiry date")
+    except Exception as e:
+        logger.error(f"Error in expiry sweep job: {e}")
+
+def run_stats_reconcile_job():
+    """Recount the statistics counters and fix any drift"""
+    try:
+        corrected = db_manager.reconcile_deal_stats()
+        if corrected:
+            logger.warning(f"Stats reconcile: corrected {corrected} drifted counters")
+    except Exception as e:
+        logger.error(f"Error in stats reconcile job: {e}")
+
 def schedule_scraping_jobs():
     """Schedule scraping jobs"""
     scrape_interval = int(os.getenv('SCRAPE_INTERVAL', 6))
@@ -121,6 +152,12 @@ def schedule_scraping_jobs():
     # Schedule expired deal checking every 2 hours (offset from scraping)
     schedule.every(2).hours.do(run_expired_check_job)
     
+    # Keep deals.is_live current as expiry dates pass
+    schedule.every(10).minutes.do(run_expiry_sweep_job)
+    
+    # Correct any drift in the statistics counters
+    schedule.every(6).hours.do(run_stats_reconcile_job)
+    
     # Also run immediately on startup
     schedule.every().minute.do(run_scraping_job).tag('startup')
     
@@ -167,26 +204,19 @@ def status():
         from database import ScrapingLog
         latest_logs = session.query(ScrapingLog).order_by(ScrapingLog.created_at.desc()).limit(10).all()
         
-        # Get deal count
-        from database import Deal
-        total_deals = session.query(Deal).count()
-        active_deals = session.query(Deal).filter(Deal.is_active == True).count()
-        expired_deals = session.query(Deal).filter(Deal.expiry_date.isnot(None)).count()
-        
-        # Get search terms count
-        from database import SearchTerm
-        search_terms_count = session.query(SearchTerm).filter(SearchTerm.is_active == True).count()
-        
         session.close()
         
+        # Deal and search term counts, from the trigger-maintained counters
+        counters = db_manager.get_deal_stats()
+        
         return jsonify({
             'status': 'running',
             'timestamp': datetime.utcnow().isoformat(),
             'stats': {
-                'total_deals': total_deals,
-                'active_deals': active_deals,
-                'expired_deals': expired_deals,
-                'search_terms': search_terms_count,
+                'total_deals': counters.get('total_deals', 0),
+                'active_deals': counters.get('active_deals', 0),
+                'expired_deals': counters.get('dated_deals', 0),
+                'search_terms': counters.get('active_search_terms', 0),
                 'expired_checker_enabled': expired_checker is not None
             },
             'recent_logs': [
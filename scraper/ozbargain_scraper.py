@@ -1,57 +1,133 @@
 import feedparser
 import requests
-import re
+from requests.adapters import HTTPAdapter
 import logging
-from datetime import datetime
-from dateutil import parser as date_parser
-from bs4 import BeautifulSoup
+from collections import namedtuple
 from database import DatabaseManager, Deal, SearchTerm
+from deal_extractor import DealExtractor
+from rate_limiter import HostRateLimiter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
 logger = logging.getLogger(__name__)
 
+# Outcome of fetching a single feed; feed is None when not modified or on error
+FeedFetch = namedtuple('FeedFetch', ['feed', 'error_message', 'start_time', 'not_modified', 'etag', 'last_modified'])
+
 class OzBargainScraper:
-    def __init__(self, database_manager):
+    def __init__(self, database_manager, max_workers=4, requests_per_second=0.5, burst=2, request_timeout=30):
         self.db = database_manager
         self.user_agent = "OzBargain-Monitor/1.0"
+        self.request_timeout = request_timeout
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': self.user_agent})
+        # Keep a pooled keep-alive connection per fetch worker
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, max_workers))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.max_workers = max_workers
+        # Politeness towards the remote host replaces fixed sleeps between feeds
+        self.rate_limiter = HostRateLimiter(requests_per_second, burst)
+        self.extractor = DealExtractor()
+        # URLs already stored during the current scrape cycle (feeds overlap heavily)
+        self.seen_urls = set()
+        
+    def start_cycle(self):
+        """Reset per-cycle state before scraping the main and category feeds"""
+        self.seen_urls = set()
         
     def scrape_rss_feed(self, feed_url):
         """Scrape deals from OzBargain RSS feed"""
+        return self._process_feed(feed_url, self._fetch_feed(feed_url))
+    
+    def _fetch_feed(self, feed_url):
+        """Fetch and parse a feed with a conditional GET, returning a FeedFetch"""
+        self.rate_limiter.acquire(feed_url)
         start_time = time.time()
-        deals_found = 0
-        new_deals = 0
-        updated_deals = 0
-        error_message = None
         
         try:
             logger.info(f"Scraping RSS feed: {feed_url}")
             
+            headers = {}
+            etag, last_modified = self.db.get_feed_cache(feed_url)
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+            
+            response = self.session.get(feed_url, headers=headers, timeout=self.request_timeout)
+            
+            if response.status_code == 304:
+                logger.info(f"RSS feed not modified since last scrape: {feed_url}")
+                return FeedFetch(None, None, start_time, True, etag, last_modified)
+            
+            response.raise_for_status()
+            
             # Parse RSS feed
-            feed = feedparser.parse(feed_url)
+            feed = feedparser.parse(response.content, response_headers=dict(response.headers))
+            return FeedFetch(
+                feed, None, start_time, False,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified')
+            )
+        except Exception as e:
+            logger.error(f"Error fetching RSS feed {feed_url}: {e}")
+            return FeedFetch(None, str(e), start_time, False, None, None)
+    
+    def _process_feed(self, feed_url, fetch):
+        """Persist the entries of a fetched feed and log the scrape.
+        
+        Returns a (deals_found, new_deals, updated_deals, unchanged_deals) tuple.
+        """
+        feed = fetch.feed
+        start_time = fetch.start_time
+        error_message = fetch.error_message
+        deals_found = 0
+        new_deals = 0
+        updated_deals = 0
+        unchanged_deals = 0
+        
+        try:
+            if error_message or fetch.not_modified:
+                return deals_found, new_deals, updated_deals, unchanged_deals
             
             if not feed.entries:
                 logger.warning("No entries found in RSS feed")
-                return
+                return deals_found, new_deals, updated_deals, unchanged_deals
             
             deals_found = len(feed.entries)
             logger.info(f"Found {deals_found} deals in RSS feed")
             
+            batch = []
             for entry in feed.entries:
                 try:
                     deal_data = self._extract_deal_from_entry(entry)
                     if deal_data:
-                        saved_deal, is_new = self.db.save_deal(deal_data)
-                        if is_new:
-                            new_deals += 1
-                            self._match_deal_with_search_terms(saved_deal)
-                        else:
-                            updated_deals += 1
-                            
+                        # Already written by an earlier feed in this cycle
+                        if deal_data['url'] in self.seen_urls:
+                            unchanged_deals += 1
+                            continue
+                        batch.append(deal_data)
                 except Exception as e:
                     logger.error(f"Error processing entry: {e}")
                     continue
+            
+            # Write the whole feed in one transaction
+            saved = self.db.save_deals_bulk(batch)
+            
+            # New and changed deals are matched by the matcher service
+            for deal_data, (deal_id, status) in zip(batch, saved):
+                self.seen_urls.add(deal_data['url'])
+                if status == 'new':
+                    new_deals += 1
+                elif status == 'updated':
+                    updated_deals += 1
+                else:
+                    unchanged_deals += 1
+            
+            # Only remember the validators once the feed has been fully stored
+            if fetch.etag or fetch.last_modified:
+                self.db.save_feed_cache(feed_url, fetch.etag, fetch.last_modified)
                     
         except Exception as e:
             error_message = str(e)
@@ -60,186 +136,35 @@ class OzBargainScraper:
         finally:
             # Log scraping activity
             scrape_duration = int(time.time() - start_time)
+            if error_message:
+                status = 'error'
+            elif fetch.not_modified:
+                status = 'not_modified'
+            else:
+                status = 'success'
             log_data = {
                 'scrape_type': 'rss',
                 'source_url': feed_url,
                 'deals_found': deals_found,
                 'new_deals': new_deals,
                 'updated_deals': updated_deals,
-                'status': 'success' if not error_message else 'error',
+                'unchanged_deals': unchanged_deals,
+                'status': status,
                 'error_message': error_message,
                 'scrape_duration': scrape_duration
             }
             self.db.log_scraping_activity(log_data)
             
-            logger.info(f"Scraping completed: {new_deals} new, {updated_deals} updated, {scrape_duration}s")
+            logger.info(f"Scraping completed: {new_deals} new, {updated_deals} updated, {unchanged_deals} unchanged, {scrape_duration}s")
+        
+        return deals_found, new_deals, updated_deals, unchanged_deals
     
     def _extract_deal_from_entry(self, entry):
         """Extract deal information from RSS entry"""
-        try:
-            # Basic information
-            title = entry.title
-            url = entry.link
-            description = entry.get('summary', '')
-            
-            # Parse publish date
-            deal_date = None
-            if hasattr(entry, 'published'):
-                try:
-                    deal_date = date_parser.parse(entry.published)
-                except:
-                    pass
-            
-            # Try to detect expiry information from title
-            expiry_date = None
-            
-            # Check if deal is marked as expired in title
-            if '(expired)' in title.lower() or 'expired' in title.lower():
-                # If deal is marked as expired, set expiry to past date
-                from datetime import timedelta
-                expiry_date = datetime.utcnow() - timedelta(days=1)
-            else:
-                # Try to extract expiry date patterns from title/description
-                # Look for patterns like "expires 25/07/2025", "until 31 Dec", etc.
-                import re
-                expiry_patterns = [
-                    r'expires?\s+(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
-                    r'until\s+(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
-                    r'ends?\s+(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
-                    r'valid\s+until\s+(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})'
-                ]
-                
-                full_text = f"{title} {description}".lower()
-                for pattern in expiry_patterns:
-                    match = re.search(pattern, full_text, re.IGNORECASE)
-                    if match:
-                        try:
-                            expiry_date = date_parser.parse(match.group(1))
-                            break
-                        except:
-                            continue
-            
-            # Extract additional information from description HTML
-            soup = BeautifulSoup(description, 'html.parser')
-            
-            # Try to extract price information
-            price = None
-            original_price = None
-            discount_percentage = None
-            
-            # Look for price patterns in title and description
-            price_match = re.search(r'\$(\d+(?:\.\d{2})?)', title)
-            if price_match:
-                price = float(price_match.group(1))
-            
-            # Look for discount percentage
-            discount_match = re.search(r'(\d+)%\s*off', title, re.IGNORECASE)
-            if discount_match:
-                discount_percentage = int(discount_match.group(1))
-            
-            # Extract store name (often in title after a dash or "at")
-            store = None
-            store_match = re.search(r'(?:at|@)\s*([A-Za-z0-9\s]+)', title, re.IGNORECASE)
-            if store_match:
-                store = store_match.group(1).strip()
-            
-            # Extract category from RSS entry if available
-            category = None
-            if hasattr(entry, 'tags'):
-                for tag in entry.tags:
-                    if hasattr(tag, 'term'):
-                        category = tag.term
-                        break
-            
-            # Extract votes and comments from RSS extras
-            votes = 0
-            comments_count = 0
-            
-            # OzBargain RSS sometimes includes extra elements
-            if hasattr(entry, 'votes'):
-                try:
-                    votes = int(entry.votes)
-                except:
-                    pass
-                    
-            if hasattr(entry, 'comments'):
-                try:
-                    comments_count = int(entry.comments)
-                except:
-                    pass
-            
-            deal_data = {
-                'title': title,
-                'url': url,
-                'description': description,
-                'price': price,
-                'original_price': original_price,
-                'discount_percentage': discount_percentage,
-                'store': store,
-                'category': category,
-                'votes': votes,
-                'comments_count': comments_count,
-                'deal_date': deal_date,
-                'expiry_date': expiry_date,
-                'is_active': True
-            }
-            
-            return deal_data
-            
-        except Exception as e:
-            logger.error(f"Error extracting deal from entry: {e}")
-            return None
-    
-    def _match_deal_with_search_terms(self, deal):
-        """Match a deal with active search terms"""
-        try:
-            search_terms = self.db.get_search_terms()
-            
-            for search_term in search_terms:
-                match_score = self._calculate_match_score(deal, search_term)
-                
-                if match_score > 0.3:  # Threshold for considering a match
-                    self.db.save_search_match(deal.id, search_term.id, match_score)
-                    logger.info(f"Matched deal '{deal.title}' with search term '{search_term.term}' (score: {match_score})")
-                    
-        except Exception as e:
-            logger.error(f"Error matching deal with search terms: {e}")
-    
-    def _calculate_match_score(self, deal, search_term):
-        """Calculate match score between deal and search term"""
-        try:
-            term_lower = search_term.term.lower()
-            title_lower = deal.title.lower()
-            description_lower = (deal.description or '').lower()
-            store_lower = (deal.store or '').lower()
-            
-            score = 0.0
-            
-            # Exact match in title gets highest score
-            if term_lower in title_lower:
-                score += 0.8
-            
-            # Partial word match in title
-            for word in term_lower.split():
-                if word in title_lower:
-                    score += 0.3
-            
-            # Match in description
-            if term_lower in description_lower:
-                score += 0.4
-            
-            # Match in store name
-            if term_lower in store_lower:
-                score += 0.5
-            
-            # Normalize score to max 1.0
-            return min(score, 1.0)
-            
-        except Exception as e:
-            logger.error(f"Error calculating match score: {e}")
-            return 0.0
+        record = self.extractor.extract(entry)
+        return record.as_dict() if record else None
     
-    def scrape_category_feeds(self):
+    def scrape_category_feeds(self, base_url="https://www.ozbargain.com.au/cat"):
         """Scrape multiple category feeds"""
         categories = [
             'electrical-electronics',
@@ -254,13 +179,54 @@ class OzBargainScraper:
             'food-beverage'
         ]
         
-        base_url = "https://www.ozbargain.com.au/cat"
+        feed_urls = [f"{base_url}/{category}/feed" for category in categories]
+        
+        start_time = time.time()
+        totals = [0, 0, 0, 0]
+        
+        def record(counts):
+            for i, count in enumerate(counts):
+                totals[i] += count
+        
+        if self.max_workers <= 1:
+            for feed_url in feed_urls:
+                try:
+                    record(self.scrape_rss_feed(feed_url))
+                except Exception as e:
+                    logger.error(f"Error scraping category feed {feed_url}: {e}")
+                    continue
+        else:
+            # Fetch concurrently (paced by the rate limiter) and persist on this
+            # thread as each feed arrives, so DB time never holds up the network
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                future_to_url = {
+                    executor.submit(self._fetch_feed, feed_url): feed_url
+                    for feed_url in feed_urls
+                }
+                
+                for future in as_completed(future_to_url):
+                    feed_url = future_to_url[future]
+                    try:
+                        record(self._process_feed(feed_url, future.result()))
+                    except Exception as e:
+                        logger.error(f"Error scraping category feed {feed_url}: {e}")
+                        continue
+        
+        # Record the duration of the whole category cycle
+        cycle_duration = int(time.time() - start_time)
+        deals_found, new_deals, updated_deals, unchanged_deals = totals
+        try:
+            self.db.log_scraping_activity({
+                'scrape_type': 'category_cycle',
+                'source_url': base_url,
+                'deals_found': deals_found,
+                'new_deals': new_deals,
+                'updated_deals': updated_deals,
+                'unchanged_deals': unchanged_deals,
+                'status': 'success',
+                'scrape_duration': cycle_duration
+            })
+        except Exception as e:
+            logger.error(f"Error logging category cycle: {e}")
         
-        for category in categories:
-            feed_url = f"{base_url}/{category}/feed"
-            try:
-                self.scrape_rss_feed(feed_url)
-                time.sleep(2)  # Be respectful to the server
-            except Exception as e:
-                logger.error(f"Error scraping category {category}: {e}")
-                continue
\ No newline at end of file
+        logger.info(f"Category cycle completed: {len(feed_urls)} feeds, {new_deals} new, {updated_deals} updated, {unchanged_deals} unchanged, {cycle_duration}s")
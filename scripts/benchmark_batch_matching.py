@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Batch Matching Benchmark
+Compares running matching jobs one search term at a time against the batched
+single-pass query as the number of terms grows. Synthetic deals and terms are
+created inside a transaction that is rolled back, so nothing is kept
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add shared directory to path
+sys.path.append('/app/shared')
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+
+from sqlalchemy import text
+from database import BaseDatabaseManager
+
+WORDS = [
+    'apple', 'samsung', 'sony', 'lg', 'dyson', 'ninja', 'philips', 'bose', 'lenovo', 'asus',
+    'iphone', 'galaxy', 'ipad', 'macbook', 'airpods', 'switch', 'ps5', 'xbox', 'oled', 'qled',
+    'tv', 'monitor', 'laptop', 'tablet', 'headphones', 'earbuds', 'charger', 'cable', 'usb-c', 'ssd',
+]
+STORES = ['Amazon AU', 'JB Hi-Fi', 'Costco', 'Kmart', 'Bunnings', 'Officeworks', 'Woolworths', 'Coles']
+
+
+def build_vocabulary(size, rng):
+    """Common deal words plus model-number style tokens, like real titles"""
+    vocabulary = list(WORDS)
+    while len(vocabulary) < size:
+        vocabulary.append(f"{rng.choice('abcdefghkmnprstvwxz')}{rng.randint(10, 99999)}")
+    return vocabulary
+
+
+def seed_deals(session, count, vocabulary, rng):
+    """Insert synthetic live deals"""
+    titles, urls, descriptions, stores = [], [], [], []
+    for i in range(count):
+        titles.append(' '.join(rng.choices(vocabulary, k=10)) + f" ${rng.randint(5, 999)}")
+        urls.append(f"https://example.invalid/benchmark/{i}")
+        descriptions.append('<p>' + ' '.join(rng.choices(vocabulary, k=80)) + '</p>')
+        stores.append(rng.choice(STORES))
+
+    session.execute(text("""
+        INSERT INTO deals (title, url, description, store)
+        SELECT * FROM unnest(
+            CAST(:titles AS text[]), CAST(:urls AS text[]),
+            CAST(:descriptions AS text[]), CAST(:stores AS text[])
+        )
+        ON CONFLICT (url) DO NOTHING
+    """), {'titles': titles, 'urls': urls, 'descriptions': descriptions, 'stores': stores})
+
+
+def seed_terms(session, count, vocabulary, rng):
+    """Insert synthetic one or two word search terms and return their ids"""
+    terms = [' '.join(rng.sample(vocabulary, rng.randint(1, 2))) for _ in range(count)]
+    rows = session.execute(text("""
+        INSERT INTO search_terms (term, description)
+        SELECT term, 'benchmark' FROM unnest(CAST(:terms AS text[])) AS term
+        RETURNING id
+    """), {'terms': terms}).all()
+    return [row.id for row in rows]
+
+
+def timed(session, run):
+    """Time run() inside a savepoint that is rolled back afterwards"""
+    savepoint = session.begin_nested()
+    start = time.perf_counter()
+    matches = run()
+    elapsed = time.perf_counter() - start
+    savepoint.rollback()
+    return elapsed, matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-term against batched matching')
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'), help='PostgreSQL URL (default: $DATABASE_URL)')
+    parser.add_argument('--deals', type=int, default=20000, help='Synthetic deals to add')
+    parser.add_argument('--vocabulary', type=int, default=5000, help='Distinct words used by terms and deals')
+    parser.add_argument('--sizes', default='1,10,50,200', help='Comma-separated numbers of terms')
+
+    args = parser.parse_args()
+    if not args.database_url:
+        print("DATABASE_URL is required")
+        sys.exit(1)
+
+    rng = random.Random(42)
+    vocabulary = build_vocabulary(args.vocabulary, rng)
+    db = BaseDatabaseManager(args.database_url)
+    session = db.get_session()
+    try:
+        seed_deals(session, args.deals, vocabulary, rng)
+        print(f"Deals: {session.execute(text('SELECT COUNT(*) FROM deals')).scalar()}")
+        print(f"{'terms':>6} | {'per-term s':>10} | {'batch s':>8} | {'speedup':>7} | matches")
+        print("-" * 52)
+
+        for size in (int(value) for value in args.sizes.split(',')):
+            savepoint = session.begin_nested()
+            term_ids = seed_terms(session, size, vocabulary, rng)
+
+            loop_time, loop_matches = timed(
+                session, lambda: sum(db._match_search_term(session, term_id) for term_id in term_ids)
+            )
+            batch_time, batch_matches = timed(
+                session, lambda: sum(db._match_search_terms(session, term_ids).values())
+            )
+            savepoint.rollback()
+
+            if loop_matches != batch_matches:
+                print(f"WARNING: per-term created {loop_matches} matches, batch created {batch_matches}")
+            print(f"{size:>6} | {loop_time:>10.3f} | {batch_time:>8.3f} | {loop_time / batch_time:>6.1f}x | {batch_matches}")
+    finally:
+        # Leave the database exactly as it was
+        session.rollback()
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Deals Pagination Benchmark
+Compares the deals page's previous offset-style fetch (the first page * 20
+deals, sliced in Python) with keyset pagination at increasing page depths.
+Synthetic deals are created inside a transaction that is rolled back, so
+nothing is kept
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add shared directory to path
+sys.path.append('/app/shared')
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+
+from sqlalchemy import text, desc
+from database import WebDatabaseManager, Deal
+
+PER_PAGE = 20
+
+
+def seed_deals(session, count):
+    """Insert synthetic live deals, one minute apart"""
+    session.execute(text("""
+        INSERT INTO deals (title, url, store, created_at)
+        SELECT 'Benchmark deal ' || i, 'https://example.invalid/benchmark/' || i,
+               'Store ' || (i % 50), LOCALTIMESTAMP - i * INTERVAL '1 minute'
+        FROM generate_series(1, :count) AS i
+        ON CONFLICT (url) DO NOTHING
+    """), {'count': count})
+    session.execute(text("ANALYZE deals"))
+
+
+def offset_page(session, page):
+    """The deals page as it was fetched before keyset pagination"""
+    deals = session.query(Deal).filter(Deal.is_live == True).order_by(
+        desc(Deal.created_at)
+    ).limit(PER_PAGE * page).all()
+    return deals[(page - 1) * PER_PAGE:]
+
+
+def cursor_before_page(session, page):
+    """Cursor of the last deal on the page before this one (setup only, not timed)"""
+    row = session.execute(text("""
+        SELECT created_at, id FROM deals WHERE is_live
+        ORDER BY created_at DESC, id DESC OFFSET :offset LIMIT 1
+    """), {'offset': (page - 1) * PER_PAGE - 1}).one()
+    return row.created_at, row.id
+
+
+def timed(run, repeat):
+    """Best of repeat runs, in milliseconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark offset against keyset pagination of the deals page')
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'), help='PostgreSQL URL (default: $DATABASE_URL)')
+    parser.add_argument('--deals', type=int, default=100000, help='Synthetic deals to add')
+    parser.add_argument('--pages', default='1,10,100,1000,4000', help='Comma-separated page numbers')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement; the best is reported')
+
+    args = parser.parse_args()
+    if not args.database_url:
+        print("DATABASE_URL is required")
+        sys.exit(1)
+
+    db = WebDatabaseManager(args.database_url)
+    session = db.get_session()
+    try:
+        seed_deals(session, args.deals)
+        live_deals = session.execute(text("SELECT COUNT(*) FROM deals WHERE is_live")).scalar()
+        print(f"Live deals: {live_deals}")
+        print(f"{'page':>6} | {'offset ms':>10} | {'keyset ms':>10} | {'speedup':>7}")
+        print("-" * 44)
+
+        for page in (int(value) for value in args.pages.split(',')):
+            if (page - 1) * PER_PAGE >= live_deals:
+                print(f"{page:>6} | beyond the last page")
+                continue
+
+            after = cursor_before_page(session, page) if page > 1 else None
+            offset_time, offset_deals = timed(lambda: offset_page(session, page), args.repeat)
+            keyset_time, (keyset_deals, _, _) = timed(
+                lambda: db._deals_page(session, PER_PAGE, after=after), args.repeat
+            )
+
+            if [deal.id for deal in offset_deals] != [deal.id for deal in keyset_deals]:
+                print(f"WARNING: page {page} differs between offset and keyset pagination")
+            print(f"{page:>6} | {offset_time:>10.2f} | {keyset_time:>10.2f} | {offset_time / keyset_time:>6.1f}x")
+    finally:
+        # Leave the database exactly as it was
+        session.rollback()
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
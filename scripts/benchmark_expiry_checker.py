@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Expiry Checker Benchmark
+Measures expiry check throughput against a local HTTP stand-in that serves
+deal pages with a fixed latency, one in ten of them marked expired. Compares
+the previous thread pool loop, which slept half a second per result, with
+the async engine. Synthetic deals point at the stand-in and are deleted
+again afterwards
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database'))
+
+from sqlalchemy import text
+from expired_checker import ExpiredDealChecker
+
+ACTIVE_PAGE = b'<html><body><div class="node"><h1>Deal</h1><p>Get it while it lasts</p></div></body></html>'
+EXPIRED_PAGE = b'<html><body><div class="node"><h1>Deal</h1><span class="expired">Expired</span></div></body></html>'
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    latency = 0.1
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        deal_number = int(self.path.rstrip('/').rsplit('/', 1)[-1])
+        body = EXPIRED_PAGE if deal_number % 10 == 0 else ACTIVE_PAGE
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def seed(checker, url_prefix, count):
+    session = checker.SessionLocal()
+    try:
+        session.execute(text("""
+            INSERT INTO deals (title, url, store, created_at)
+            SELECT 'Expiry benchmark deal ' || i, :prefix || i, 'Benchmark', LOCALTIMESTAMP
+            FROM generate_series(1, :count) AS i
+            ON CONFLICT (url) DO NOTHING
+        """), {'prefix': url_prefix, 'count': count})
+        session.commit()
+        return [dict(row._mapping) for row in session.execute(text(
+            f"SELECT {ExpiredDealChecker.DEAL_COLUMNS} FROM deals WHERE url LIKE :pattern ORDER BY id"
+        ), {'pattern': url_prefix + '%'})]
+    finally:
+        session.close()
+
+
+def reset(checker, url_prefix):
+    session = checker.SessionLocal()
+    try:
+        session.execute(text(
+            "UPDATE deals SET expiry_date = NULL, last_checked = NULL WHERE url LIKE :pattern"
+        ), {'pattern': url_prefix + '%'})
+        session.commit()
+    finally:
+        session.close()
+
+
+def cleanup(checker, url_prefix):
+    session = checker.SessionLocal()
+    try:
+        session.execute(text("DELETE FROM deals WHERE url LIKE :pattern"), {'pattern': url_prefix + '%'})
+        session.commit()
+    finally:
+        session.close()
+
+
+def legacy_check(checker, deals):
+    """The thread pool loop as it was before the async engine"""
+    results = []
+    with ThreadPoolExecutor(max_workers=checker.max_workers) as executor:
+        futures = {executor.submit(checker.check_deal_expired, deal['url'], deal['id']): deal for deal in deals}
+        for future in as_completed(futures):
+            deal = futures[future]
+            is_expired = future.result()
+            if is_expired is not None:
+                success = checker.update_deal_expiry_status(deal['id'], is_expired, datetime.now())
+                results.append({'deal_id': deal['id'], 'is_expired': is_expired, 'updated': success})
+            time.sleep(0.5)
+    return results
+
+
+def run(name, check, deals):
+    start = time.perf_counter()
+    results = check(deals)
+    elapsed = time.perf_counter() - start
+    expired = sum(1 for r in results if r['is_expired'])
+    print(f"{name:<28} | {len(deals):>6} | {len(results):>7} | {expired:>7} | {elapsed:>8.2f} | {len(deals) / elapsed:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the expiry checker against a local HTTP stand-in')
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'), help='PostgreSQL URL (default: $DATABASE_URL)')
+    parser.add_argument('--deals', type=int, default=2000, help='Deals checked by the async engine')
+    parser.add_argument('--legacy-deals', type=int, default=40, help='Deals checked by the previous loop')
+    parser.add_argument('--latency', type=float, default=0.1, help='Stand-in response latency in seconds')
+    parser.add_argument('--max-workers', type=int, default=16, help='Concurrent requests')
+    parser.add_argument('--host-concurrency', type=int, default=16, help='Concurrent requests per host')
+    parser.add_argument('--rate-limit', type=float, default=0, help='Requests per second per host, 0 for no limit')
+
+    args = parser.parse_args()
+    if not args.database_url:
+        print("DATABASE_URL is required")
+        sys.exit(1)
+
+    StandInHandler.latency = args.latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url_prefix = f"http://127.0.0.1:{server.server_address[1]}/node/"
+
+    checker = ExpiredDealChecker(
+        args.database_url,
+        max_workers=args.max_workers,
+        per_host_concurrency=args.host_concurrency,
+        requests_per_second=args.rate_limit
+    )
+
+    try:
+        deals = seed(checker, url_prefix, max(args.deals, args.legacy_deals))
+        print(f"{'engine':<28} | {'deals':>6} | {'checked':>7} | {'expired':>7} | {'seconds':>8} | {'deals/s':>8}")
+        print("-" * 80)
+
+        run('thread pool + 0.5s sleep', lambda d: legacy_check(checker, d), deals[:args.legacy_deals])
+        reset(checker, url_prefix)
+        run('async engine', checker.check_deals_batch, deals[:args.deals])
+    finally:
+        cleanup(checker, url_prefix)
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
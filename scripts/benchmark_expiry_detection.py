@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Expiry Detection Benchmark
+Measures pages/second and bytes read per page of expired deal detection
+over saved deal pages, comparing the previous BeautifulSoup indicator chain,
+which parsed every page in full, with the streaming ExpiredPageDetector
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+# Add database directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database'))
+
+from expired_checker import ExpiredPageDetector, PAGE_CHUNK_SIZE, parse_deal_date
+
+DEAL_URL_PREFIX = 'https://www.ozbargain.com.au/node/'
+
+
+def legacy_is_expired(content):
+    """The content checks as they ran before ExpiredPageDetector, kept for comparison"""
+    soup = BeautifulSoup(content, 'html.parser')
+
+    expired_indicators = [
+        lambda s: any(text in s.get_text().lower() for text in [
+            'expired', 'this deal has expired', 'deal expired',
+            'offer expired', 'promotion expired', 'sale ended',
+            'deal no longer available', 'offer no longer valid'
+        ]),
+        lambda s: any(elem.get('class', []) for elem in s.find_all()
+                      if any(cls for cls in elem.get('class', [])
+                             if 'expired' in cls.lower() or 'ended' in cls.lower())),
+        lambda s: any(meta.get('content', '').lower()
+                      for meta in s.find_all('meta', {'name': 'description'})
+                      if 'expired' in meta.get('content', '').lower()),
+        lambda s: bool(s.find('div', class_=lambda x: x and 'expired' in x.lower())),
+        lambda s: bool(s.find('span', string=lambda text: text and 'expired' in text.lower())),
+        lambda s: bool(s.find('div', string=lambda text: text and
+                              any(phrase in text.lower() for phrase in ['deal expired', 'expired deal']))),
+        lambda s: bool(s.find('time', string=lambda text: text and
+                              datetime.now() > parse_deal_date(text) if parse_deal_date(text) else False))
+    ]
+
+    for check in expired_indicators:
+        try:
+            if check(soup):
+                return True
+        except Exception:
+            continue
+    return False
+
+
+def streaming_is_expired(content):
+    detector = ExpiredPageDetector(DEAL_URL_PREFIX)
+    for start in range(0, len(content), PAGE_CHUNK_SIZE):
+        if detector.feed(content[start:start + PAGE_CHUNK_SIZE]):
+            break
+    return detector.close(), detector.bytes_read
+
+
+def record_pages(directory, limit):
+    """Save the pages of recent deals into a directory for later benchmarking"""
+    import requests
+    from sqlalchemy import create_engine, text
+
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        print("DATABASE_URL is required to find deals to record")
+        sys.exit(1)
+
+    with create_engine(database_url).connect() as connection:
+        deals = connection.execute(text(
+            "SELECT id, url FROM deals WHERE url LIKE :prefix ORDER BY created_at DESC LIMIT :limit"
+        ), {'prefix': DEAL_URL_PREFIX + '%', 'limit': limit}).all()
+
+    os.makedirs(directory, exist_ok=True)
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'OzBargain-Monitor/1.0'})
+
+    for deal_id, url in deals:
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+        path = os.path.join(directory, f"deal_{deal_id}.html")
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        print(f"Saved {url} -> {path}")
+        time.sleep(2)
+
+
+def load_pages(paths):
+    """Read saved deal pages (or directories of them)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.endswith('.html')
+            ))
+        else:
+            files.append(path)
+
+    pages = []
+    for path in files:
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    return pages
+
+
+def measure(detect, pages, rounds):
+    """Pages per second, and the verdicts of the last round"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        verdicts = [detect(page) for page in pages]
+    elapsed = time.perf_counter() - start
+    return (len(pages) * rounds) / elapsed if elapsed else float('inf'), verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark expired deal detection over saved deal pages')
+    parser.add_argument('pages', nargs='*', help='Saved deal page HTML files or directories')
+    parser.add_argument('--record', metavar='DIR', help='Record the pages of recent deals into DIR and exit')
+    parser.add_argument('--record-limit', type=int, default=50, help='Deal pages to record')
+    parser.add_argument('--rounds', type=int, default=5, help='Passes over the pages per measurement')
+
+    args = parser.parse_args()
+
+    if args.record:
+        record_pages(args.record, args.record_limit)
+        return
+
+    pages = load_pages(args.pages)
+    if not pages:
+        print("No deal pages found. Record some first with --record <dir>")
+        sys.exit(1)
+
+    total_bytes = sum(len(page) for page in pages)
+    before, legacy_verdicts = measure(legacy_is_expired, pages, args.rounds)
+    after, results = measure(streaming_is_expired, pages, args.rounds)
+    verdicts = [expired for expired, _ in results]
+    bytes_read = sum(read for _, read in results)
+
+    print(f"Pages: {len(pages)}, {total_bytes / len(pages) / 1024:,.1f} KiB average, {args.rounds} rounds")
+    print(f"Before (BeautifulSoup indicators): {before:,.1f} pages/s, {total_bytes / len(pages) / 1024:,.1f} KiB read per page")
+    print(f"After  (ExpiredPageDetector):      {after:,.1f} pages/s, {bytes_read / len(pages) / 1024:,.1f} KiB read per page")
+    print(f"Speedup: {after / before:.2f}x")
+    print(f"Expired: {sum(legacy_verdicts)} before, {sum(verdicts)} after; "
+          f"{sum(1 for a, b in zip(legacy_verdicts, verdicts) if a != b)} pages differ")
+
+
+if __name__ == "__main__":
+    main()
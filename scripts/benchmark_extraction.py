@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Deal Extraction Benchmark
+Measures entries/second of the scraper's deal extraction over a recorded
+corpus of OzBargain RSS feeds, comparing the previous per-entry extraction
+with the precompiled DealExtractor
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+
+import feedparser
+from bs4 import BeautifulSoup
+from dateutil import parser as date_parser
+
+# Add scraper directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scraper'))
+
+from deal_extractor import DealExtractor
+
+FEED_URLS = ['https://www.ozbargain.com.au/deals/feed'] + [
+    f"https://www.ozbargain.com.au/cat/{category}/feed" for category in [
+        'electrical-electronics', 'computing', 'gaming', 'mobile', 'home-garden',
+        'automotive', 'fashion-apparel', 'books-magazines', 'entertainment', 'food-beverage'
+    ]
+]
+
+
+def legacy_extract(entry):
+    """The extraction as it ran before DealExtractor, kept for comparison"""
+    title = entry.title
+    description = entry.get('summary', '')
+
+    deal_date = None
+    if hasattr(entry, 'published'):
+        try:
+            deal_date = date_parser.parse(entry.published)
+        except Exception:
+            pass
+
+    expiry_date = None
+    if '(expired)' in title.lower() or 'expired' in title.lower():
+        expiry_date = datetime.utcnow() - timedelta(days=1)
+    else:
+        expiry_patterns = [
+            r'expires?\s+(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
+            r'until\s+(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
+            r'ends?\s+(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})',
+            r'valid\s+until\s+(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})'
+        ]
+        full_text = f"{title} {description}".lower()
+        for pattern in expiry_patterns:
+            match = re.search(pattern, full_text, re.IGNORECASE)
+            if match:
+                try:
+                    expiry_date = date_parser.parse(match.group(1))
+                    break
+                except Exception:
+                    continue
+
+    BeautifulSoup(description, 'html.parser')
+
+    price = None
+    price_match = re.search(r'\$(\d+(?:\.\d{2})?)', title)
+    if price_match:
+        price = float(price_match.group(1))
+
+    discount_percentage = None
+    discount_match = re.search(r'(\d+)%\s*off', title, re.IGNORECASE)
+    if discount_match:
+        discount_percentage = int(discount_match.group(1))
+
+    store = None
+    store_match = re.search(r'(?:at|@)\s*([A-Za-z0-9\s]+)', title, re.IGNORECASE)
+    if store_match:
+        store = store_match.group(1).strip()
+
+    category = None
+    if hasattr(entry, 'tags'):
+        for tag in entry.tags:
+            if hasattr(tag, 'term'):
+                category = tag.term
+                break
+
+    return {
+        'title': title, 'url': entry.link, 'description': description, 'price': price,
+        'discount_percentage': discount_percentage, 'store': store, 'category': category,
+        'deal_date': deal_date, 'expiry_date': expiry_date
+    }
+
+
+def record_corpus(directory):
+    """Save the live OzBargain feeds into a directory for later benchmarking"""
+    import requests
+
+    os.makedirs(directory, exist_ok=True)
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'OzBargain-Monitor/1.0'})
+
+    for i, feed_url in enumerate(FEED_URLS):
+        response = session.get(feed_url, timeout=30)
+        response.raise_for_status()
+        path = os.path.join(directory, f"feed_{i:02d}.xml")
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        print(f"Saved {feed_url} -> {path}")
+        time.sleep(2)
+
+
+def load_corpus(paths):
+    """Parse saved feed files (or directories of them) into feed entries"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.endswith('.xml')
+            ))
+        else:
+            files.append(path)
+
+    entries = []
+    for path in files:
+        entries.extend(feedparser.parse(path).entries)
+    return entries
+
+
+def measure(extract, entries, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for entry in entries:
+            extract(entry)
+    elapsed = time.perf_counter() - start
+    return (len(entries) * rounds) / elapsed if elapsed else float('inf')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark deal extraction over recorded feeds')
+    parser.add_argument('corpus', nargs='*', help='Saved feed XML files or directories')
+    parser.add_argument('--record', metavar='DIR', help='Record the live feeds into DIR and exit')
+    parser.add_argument('--rounds', type=int, default=20, help='Passes over the corpus per measurement')
+
+    args = parser.parse_args()
+
+    if args.record:
+        record_corpus(args.record)
+        return
+
+    entries = load_corpus(args.corpus)
+    if not entries:
+        print("No feed entries found. Record a corpus first with --record <dir>")
+        sys.exit(1)
+
+    extractor = DealExtractor()
+
+    print(f"Corpus: {len(entries)} entries, {args.rounds} rounds")
+    before = measure(legacy_extract, entries, args.rounds)
+    after = measure(extractor.extract, entries, args.rounds)
+    print(f"Before (per-entry regex + BeautifulSoup): {before:,.0f} entries/s")
+    print(f"After  (DealExtractor):                   {after:,.0f} entries/s")
+    print(f"Speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+List View Benchmark
+Compares loading the homepage, deals page and matched deals lists as full
+Deal entities (the previous queries) with the DealSummary projections, in
+time and Python memory per page. Synthetic deals with large HTML
+descriptions are added under https://example.invalid/benchmark/ and
+deleted again afterwards
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+# Add shared directory to path
+sys.path.append('/app/shared')
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+
+from sqlalchemy import text, desc
+from database import WebDatabaseManager, Deal, SearchMatch, SearchTerm
+
+URL_PREFIX = 'https://example.invalid/benchmark/'
+
+
+def seed(db, count, description_size, rng):
+    """Insert synthetic deals, a search term and matches for a fifth of the deals"""
+    words = [f"w{rng.randint(0, 99999)}" for _ in range(5000)]
+    session = db.get_session()
+    try:
+        for start in range(0, count, 1000):
+            batch = range(start, min(start + 1000, count))
+            descriptions = [
+                '<p>' + ' '.join(rng.choices(words, k=description_size // 7)) + '</p>' for _ in batch
+            ]
+            session.execute(text("""
+                INSERT INTO deals (title, url, description, store, price, votes, comments_count, created_at)
+                SELECT 'Benchmark deal ' || i, :prefix || i, d, 'Store ' || (i % 50), 9.99, i % 40, i % 15,
+                       LOCALTIMESTAMP - i * INTERVAL '1 second'
+                FROM unnest(CAST(:ids AS integer[]), CAST(:descriptions AS text[])) AS t(i, d)
+                ON CONFLICT (url) DO NOTHING
+            """), {'prefix': URL_PREFIX, 'ids': list(batch), 'descriptions': descriptions})
+
+        term_id = session.execute(text(
+            "INSERT INTO search_terms (term, description) VALUES ('benchmark deal', 'benchmark') RETURNING id"
+        )).scalar()
+        session.execute(text("""
+            INSERT INTO search_matches (deal_id, search_term_id, match_score)
+            SELECT id, :term_id, 0.8 FROM deals WHERE url LIKE :pattern AND id % 5 = 0
+            ON CONFLICT DO NOTHING
+        """), {'term_id': term_id, 'pattern': URL_PREFIX + '%'})
+        session.execute(text("ANALYZE deals"))
+        session.commit()
+        return term_id
+    finally:
+        session.close()
+
+
+def cleanup(db):
+    session = db.get_session()
+    try:
+        session.execute(text("DELETE FROM search_terms WHERE description = 'benchmark' AND term = 'benchmark deal'"))
+        session.execute(text("DELETE FROM deals WHERE url LIKE :pattern"), {'pattern': URL_PREFIX + '%'})
+        session.commit()
+    finally:
+        session.close()
+
+
+# The list queries as they were before the projections
+def entity_recent_deals(db, limit):
+    session = db.get_session()
+    try:
+        return session.query(Deal).filter(Deal.is_live == True).order_by(desc(Deal.created_at)).limit(limit).all()
+    finally:
+        session.close()
+
+
+def entity_deals_page(db, limit):
+    session = db.get_session()
+    try:
+        return session.query(Deal).filter(Deal.is_live == True).order_by(
+            desc(Deal.created_at), desc(Deal.id)
+        ).limit(limit + 1).all()[:limit]
+    finally:
+        session.close()
+
+
+def entity_matched_deals(db, limit):
+    session = db.get_session()
+    try:
+        return session.query(Deal).join(SearchMatch).join(SearchTerm).filter(
+            Deal.is_live == True, SearchTerm.is_active == True
+        ).order_by(desc(Deal.created_at)).limit(limit).all()
+    finally:
+        session.close()
+
+
+def measure(load, repeat):
+    """Best time in ms over repeat loads, and the peak Python memory of one load in KiB"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    rows = load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1024, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark list views as entities against projections')
+    parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'), help='PostgreSQL URL (default: $DATABASE_URL)')
+    parser.add_argument('--deals', type=int, default=5000, help='Synthetic deals to add')
+    parser.add_argument('--description-size', type=int, default=20000, help='Approximate description length in characters')
+    parser.add_argument('--repeat', type=int, default=20, help='Loads per measurement; the best is reported')
+
+    args = parser.parse_args()
+    if not args.database_url:
+        print("DATABASE_URL is required")
+        sys.exit(1)
+
+    rng = random.Random(42)
+    db = WebDatabaseManager(args.database_url)
+    views = [
+        ('homepage recent (20)', lambda: entity_recent_deals(db, 20), lambda: db.get_recent_deals(limit=20)),
+        ('deals page (20)', lambda: entity_deals_page(db, 20), lambda: db.get_deals_page(limit=20)[0]),
+        ('matched deals (50)', lambda: entity_matched_deals(db, 50), lambda: db.get_matched_deals(limit=50)),
+    ]
+
+    try:
+        seed(db, args.deals, args.description_size, rng)
+        print(f"{'view':<22} | {'entity ms':>9} | {'summary ms':>10} | {'entity KiB':>10} | {'summary KiB':>11}")
+        print("-" * 75)
+
+        for name, before, after in views:
+            before_ms, before_kib, entities = measure(before, args.repeat)
+            after_ms, after_kib, summaries = measure(after, args.repeat)
+
+            if [deal.id for deal in entities] != [deal.id for deal in summaries]:
+                print(f"WARNING: {name} lists different deals")
+            print(f"{name:<22} | {before_ms:>9.2f} | {after_ms:>10.2f} | {before_kib:>10,.0f} | {after_kib:>11,.0f}")
+    finally:
+        cleanup(db)
+
+
+if __name__ == "__main__":
+    main()
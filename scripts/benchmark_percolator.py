@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Percolator Benchmark
+Compares matching deals term-by-term against the Aho-Corasick percolator
+with 1k, 10k and 100k synthetic search terms
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add shared directory to path
+sys.path.append('/app/shared')
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'shared'))
+
+from percolator import Percolator, calculate_match_score, MATCH_THRESHOLD
+
+WORDS = [
+    'apple', 'samsung', 'sony', 'lg', 'dyson', 'ninja', 'philips', 'bose', 'lenovo', 'asus',
+    'iphone', 'galaxy', 'ipad', 'macbook', 'airpods', 'switch', 'ps5', 'xbox', 'oled', 'qled',
+    'tv', 'monitor', 'laptop', 'tablet', 'headphones', 'earbuds', 'charger', 'cable', 'usb-c', 'ssd',
+    'nvme', '1tb', '2tb', 'router', 'mesh', 'vacuum', 'fryer', 'kettle', 'blender', 'drill',
+    'amazon', 'jb', 'hi-fi', 'costco', 'kmart', 'bunnings', 'officeworks', 'woolworths', 'coles', 'steam',
+    'free', 'shipping', 'bonus', 'cashback', 'voucher', 'bundle', 'pack', 'pro', 'max', 'mini',
+]
+
+
+def build_vocabulary(size, rng):
+    """Common deal words plus model-number style tokens, like real titles"""
+    vocabulary = list(WORDS)
+    while len(vocabulary) < size:
+        vocabulary.append(f"{rng.choice('abcdefghkmnprstvwxz')}{rng.randint(10, 99999)}")
+    return vocabulary
+
+
+def synthetic_terms(count, vocabulary, rng):
+    """Generate distinct one to three word search terms"""
+    terms = set()
+    while len(terms) < count:
+        terms.add(' '.join(rng.sample(vocabulary, rng.randint(1, 3))))
+    return list(terms)
+
+
+def synthetic_deals(count, vocabulary, rng):
+    """Generate deals with titles, HTML descriptions and stores"""
+    deals = []
+    for _ in range(count):
+        title = ' '.join(rng.choices(vocabulary, k=10)) + f" ${rng.randint(5, 999)}"
+        description = '<p>' + ' '.join(rng.choices(vocabulary, k=80)) + '</p>'
+        deals.append((title, description, rng.choice(WORDS[40:50])))
+    return deals
+
+
+def naive_match(terms, deals):
+    matches = 0
+    for title, description, store in deals:
+        for term in terms:
+            if calculate_match_score(term, title, description, store) > MATCH_THRESHOLD:
+                matches += 1
+    return matches
+
+
+def percolator_match(percolator, deals):
+    matches = 0
+    for title, description, store in deals:
+        matches += len(percolator.match(title, description, store))
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark search term percolation')
+    parser.add_argument('--deals', type=int, default=200, help='Synthetic deals per run')
+    parser.add_argument('--vocabulary', type=int, default=5000, help='Distinct words used by terms and deals')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated term counts')
+    parser.add_argument('--skip-naive-above', type=int, default=10000,
+                        help='Skip the term-by-term baseline above this many terms')
+
+    args = parser.parse_args()
+    rng = random.Random(42)
+    vocabulary = build_vocabulary(args.vocabulary, rng)
+    deals = synthetic_deals(args.deals, vocabulary, rng)
+
+    print(f"{'terms':>8} | {'build s':>8} | {'naive deals/s':>14} | {'percolator deals/s':>18} | matches")
+    print("-" * 72)
+
+    for size in (int(value) for value in args.sizes.split(',')):
+        terms = synthetic_terms(size, vocabulary, rng)
+
+        start = time.perf_counter()
+        percolator = Percolator(enumerate(terms))
+        percolator.match('warm up', '', '')
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matches = percolator_match(percolator, deals)
+        percolator_rate = len(deals) / (time.perf_counter() - start)
+
+        naive_rate = '-'
+        if size <= args.skip_naive_above:
+            start = time.perf_counter()
+            naive_matches = naive_match(terms, deals)
+            naive_rate = f"{len(deals) / (time.perf_counter() - start):,.1f}"
+            if naive_matches != matches:
+                print(f"WARNING: baseline found {naive_matches} matches, percolator found {matches}")
+
+        print(f"{size:>8} | {build_time:>8.2f} | {naive_rate:>14} | {percolator_rate:>18,.1f} | {matches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Revisit Policy Benchmark
+Simulates the expired checker over a stream of synthetic deals whose true
+expiry times are known, comparing the previous schedule (newest deals not
+checked in 24 hours) with RevisitPolicy under the same per-run request
+budget. Reports expiries found, requests spent on deals that never expire
+and detection latency, the time from a deal's real expiry to its flagging.
+Expiries still unflagged when the simulation ends count with their latency
+so far
+"""
+
+import os
+import sys
+import math
+import random
+import argparse
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+# Add database directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database'))
+
+from revisit_policy import RevisitPolicy
+
+START = datetime(2026, 1, 1)
+
+
+def generate_deals(rng, days, deals_per_hour, stores, categories):
+    """Deals with a store, category and votes, and when (if ever) each really expires"""
+    store_shares = [rng.betavariate(2, 5) for _ in range(stores)]
+    category_shares = [rng.betavariate(2, 5) for _ in range(categories)]
+
+    deals = []
+    for hour in range(days * 24):
+        for _ in range(rng.randint(0, 2 * deals_per_hour)):
+            store_id, category = rng.randrange(stores), f"cat{rng.randrange(categories)}"
+            votes = int(rng.paretovariate(1.2)) - 1
+            created_at = START + timedelta(hours=hour + rng.random())
+
+            expires_at = None
+            if rng.random() < (store_shares[store_id] + category_shares[int(category[3:])]) / 2:
+                # Log-normal lifetimes, shorter for popular deals
+                lifetime = rng.lognormvariate(math.log(18), 1.2) / (1 + math.log1p(votes) / 2)
+                expires_at = created_at + timedelta(hours=lifetime)
+
+            deals.append({
+                'id': len(deals), 'created_at': created_at, 'store_id': store_id, 'category': category,
+                'votes': votes, 'expires_at': expires_at, 'last_checked': None, 'last_active_at': None,
+                'next_check_at': created_at, 'flagged_at': None
+            })
+    return deals
+
+
+def legacy_candidates(deals, now, budget):
+    cutoff = now - timedelta(hours=24)
+    due = [
+        deal for deal in deals
+        if deal['created_at'] <= now and deal['flagged_at'] is None
+        and (deal['last_checked'] is None or deal['last_checked'] < cutoff)
+    ]
+    due.sort(key=lambda deal: deal['created_at'], reverse=True)
+    return due[:budget]
+
+
+def policy_candidates(policy, deals, now, budget, candidate_factor):
+    """What select_deals_to_check() picks: the policy's ranking of the soonest due deals"""
+    unflagged = [deal for deal in deals if deal['created_at'] <= now and deal['flagged_at'] is None]
+    unflagged.sort(key=lambda deal: deal['next_check_at'])
+
+    # The counts get_expiry_rates() reads, over the last 30 days of checks
+    since = now - timedelta(days=30)
+    counts = defaultdict(lambda: [0, 0])
+    for deal in deals:
+        if deal['last_checked'] is not None and deal['last_checked'] >= since:
+            expired = deal['flagged_at'] is not None
+            for key in ((deal['store_id'], None), (None, deal['category']), (None, None)):
+                counts[key][0] += expired
+                counts[key][1] += 1
+    policy.load_expiry_rates([(store_id, category, expired, checked) for (store_id, category), (expired, checked) in counts.items()])
+
+    return policy.select(unflagged[:budget * candidate_factor], budget, now)
+
+
+def simulate(deals, days, budget, interval_hours, policy=None, candidate_factor=4):
+    requests = wasted = 0
+    for run in range(int(days * 24 / interval_hours)):
+        now = START + timedelta(hours=run * interval_hours)
+        if policy is None:
+            checked = legacy_candidates(deals, now, budget)
+        else:
+            checked = policy_candidates(policy, deals, now, budget, candidate_factor)
+
+        for deal in checked:
+            requests += 1
+            wasted += deal['expires_at'] is None
+            deal['last_checked'] = now
+            if deal['expires_at'] is not None and deal['expires_at'] <= now:
+                deal['flagged_at'] = now
+            else:
+                deal['last_active_at'] = now
+                if policy is not None:
+                    deal['next_check_at'] = policy.next_check_at(deal, now)
+
+    end = START + timedelta(days=days)
+    expired = [deal for deal in deals if deal['expires_at'] is not None and deal['expires_at'] <= end]
+    latencies = sorted(((deal['flagged_at'] or end) - deal['expires_at']).total_seconds() / 3600 for deal in expired)
+    return {
+        'requests': requests,
+        'found': sum(1 for deal in expired if deal['flagged_at']),
+        'expired': len(expired),
+        'wasted': wasted,
+        'mean': sum(latencies) / len(latencies) if latencies else None,
+        'median': latencies[len(latencies) // 2] if latencies else None,
+        'p90': latencies[int(len(latencies) * 0.9)] if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate expiry check scheduling with a fixed request budget')
+    parser.add_argument('--days', type=int, default=30, help='Days simulated')
+    parser.add_argument('--deals-per-hour', type=int, default=10, help='Average new deals per hour')
+    parser.add_argument('--budget', type=int, default=50, help='Checks per run')
+    parser.add_argument('--interval', type=float, default=2, help='Hours between runs')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    args = parser.parse_args()
+
+    print(f"{'schedule':<22} | {'requests':>8} | {'found':>11} | {'never expire':>12} | "
+          f"{'mean h':>7} | {'median h':>8} | {'p90 h':>7}")
+    print("-" * 94)
+    for name, policy in [('24h, newest first', None), ('RevisitPolicy', RevisitPolicy())]:
+        deals = generate_deals(random.Random(args.seed), args.days, args.deals_per_hour, 20, 8)
+        result = simulate(deals, args.days, args.budget, args.interval, policy)
+        found = f"{result['found']}/{result['expired']}"
+        wasted = f"{100 * result['wasted'] / max(result['requests'], 1):.0f}%"
+        mean, median, p90 = (
+            f"{result[key]:.1f}" if result[key] is not None else '-' for key in ('mean', 'median', 'p90')
+        )
+        print(f"{name:<22} | {result['requests']:>8} | {found:>11} | {wasted:>12} | {mean:>7} | {median:>8} | {p90:>7}")
+
+
+if __name__ == "__main__":
+    main()
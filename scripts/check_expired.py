@@ -8,6 +8,7 @@ import os
 import sys
 import argparse
 import logging
+from datetime import datetime
 
 # Add database directory to path
 sys.path.append('/app/database')
@@ -28,46 +29,50 @@ def check_specific_url(checker, url):
     print(f"Checking deal: {url}")
     
     # Get deal info from database
-    deals = checker.get_deals_to_check(limit=None, hours_since_check=0)
-    target_deal = None
-    
-    for deal in deals:
-        if deal['url'] == url:
-            target_deal = deal
-            break
+    target_deal = checker.get_deal_by_url(url)
     
     if not target_deal:
         print(f"Deal not found in database: {url}")
         return False
     
+    if target_deal['expiry_date'] is not None:
+        print(f"❌ Already marked expired on {target_deal['expiry_date']}: {target_deal['title']}")
+        return True
+    
     # Check the deal
     is_expired = checker.check_deal_expired(url, target_deal['id'])
+    checked_at = datetime.now()
     
     if is_expired is None:
         print(f"❓ Inconclusive result for: {target_deal['title']}")
         return False
     elif is_expired:
         print(f"❌ EXPIRED: {target_deal['title']}")
-        success = checker.update_deal_expiry_status(target_deal['id'], True)
+        success = checker.update_deal_expiry_status(target_deal['id'], True, checked_at=checked_at)
         print(f"   Database updated: {'✅' if success else '❌'}")
     else:
         print(f"✅ ACTIVE: {target_deal['title']}")
-        success = checker.update_deal_expiry_status(target_deal['id'], False)
+        # Schedule the next check as a batch run would
+        checker.policy.load_expiry_rates(checker.get_expiry_rates())
+        success = checker.update_deal_expiry_status(
+            target_deal['id'], False, checked_at=checked_at,
+            next_check_at=checker.policy.next_check_at(target_deal, checked_at)
+        )
         print(f"   Database updated: {'✅' if success else '❌'}")
     
     return True
 
-def batch_check(checker, limit, hours_since_check):
+def batch_check(checker, limit):
     """Run batch expired check"""
-    print(f"Running batch check (limit: {limit}, hours since check: {hours_since_check})")
+    print(f"Running batch check (limit: {limit})")
     
-    results = checker.run_expiry_check(limit, hours_since_check)
+    results = checker.run_expiry_check(limit)
     
     if not results:
         print("No deals needed checking")
         return
     
-    print(f"\nResults:")
+    print("\nResults:")
     print("-" * 60)
     
     expired_count = 0
@@ -89,7 +94,6 @@ def main():
     parser = argparse.ArgumentParser(description='Manual expired deal checker')
     parser.add_argument('--url', help='Check specific deal URL')
     parser.add_argument('--limit', type=int, default=20, help='Limit for batch check')
-    parser.add_argument('--hours-since-check', type=int, default=24, help='Hours since last check for batch')
     parser.add_argument('--batch', action='store_true', help='Run batch check instead of single URL')
     
     args = parser.parse_args()
@@ -113,21 +117,21 @@ def main():
             sys.exit(0 if success else 1)
         elif args.batch:
             # Run batch check
-            batch_check(checker, args.limit, args.hours_since_check)
+            batch_check(checker, args.limit)
             sys.exit(0)
         else:
             # Default: show some recently checked deals
             print("No action specified. Showing recent expired check candidates...")
-            deals = checker.get_deals_to_check(limit=10, hours_since_check=24)
+            deals = checker.select_deals_to_check(10)
             
             if deals:
-                print("\nDeals that could be checked:")
+                print("\nDeals that could be checked, most likely expired first:")
                 print("-" * 80)
                 for deal in deals:
-                    last_checked = deal.get('last_checked', 'Never')
+                    last_checked = deal.get('last_checked') or 'Never'
                     print(f"{deal['title'][:60]:<60} | {last_checked}")
                 print("-" * 80)
-                print(f"\nUse --batch to check these deals, or --url <URL> for specific check")
+                print("\nUse --batch to check these deals, or --url <URL> for specific check")
             else:
                 print("All deals have been checked recently")
             
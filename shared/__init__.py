@@ -11,7 +11,13 @@ from .database import (
     Deal,
     SearchMatch,
     ScrapingLog,
+    FeedCache,
     MatchingJob,
+    MatcherWatermark,
+    RematchCheckpoint,
+    Store,
+    DealStat,
+    DealSummary,
     Base,
     
     # Managers
@@ -20,6 +26,16 @@ from .database import (
     MatcherDatabaseManager,
     WebDatabaseManager,
     DatabaseManager,  # Alias for backward compatibility
+    
+    # Caches
+    SearchTermCache,
+    StoreFacetCache,
+)
+
+# Matching components
+from .percolator import (
+    Percolator,
+    calculate_match_score,
 )
 
 __all__ = [
@@ -27,11 +43,21 @@ __all__ = [
     'Deal', 
     'SearchMatch',
     'ScrapingLog',
+    'FeedCache',
     'MatchingJob',
+    'MatcherWatermark',
+    'RematchCheckpoint',
+    'Store',
+    'DealStat',
+    'DealSummary',
     'Base',
     'BaseDatabaseManager',
     'ScraperDatabaseManager',
     'MatcherDatabaseManager', 
     'WebDatabaseManager',
     'DatabaseManager',
+    'SearchTermCache',
+    'StoreFacetCache',
+    'Percolator',
+    'calculate_match_score',
 ]
\ No newline at end of file
@@ -5,13 +5,22 @@ This module consolidates all database models and managers from the scraper, matc
 All services should import from this shared module to eliminate code duplication.
 """
 
-import os
+import io
+import hashlib
+import time
 import logging
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, DECIMAL, ForeignKey, desc, func, text
+from sqlalchemy import create_engine, Column, Integer, BigInteger, String, Text, DateTime, Boolean, DECIMAL, ForeignKey, desc, func, text, literal_column, tuple_, case, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime, timedelta
 
+try:
+    from .percolator import AhoCorasickAutomaton
+except ImportError:
+    # Loaded through exec() by the services, with the shared directory on sys.path
+    from percolator import AhoCorasickAutomaton
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -42,6 +51,8 @@ class Deal(Base):
     original_price = Column(DECIMAL(10, 2))
     discount_percentage = Column(Integer)
     store = Column(String(255))
+    # Set from store by the set_deal_store_id trigger
+    store_id = Column(Integer, ForeignKey('stores.id'))
     category = Column(String(100))
     votes = Column(Integer, default=0)
     comments_count = Column(Integer, default=0)
@@ -50,10 +61,44 @@ class Deal(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = Column(Boolean, default=True)
+    # Maintained by the set_deal_is_live trigger and sweep_expired_deals()
+    is_live = Column(Boolean, default=True)
+    content_hash = Column(String(64))
+    match_hash = Column(String(64))
+    # Set on insert and whenever match_hash changes; the matcher's watermark
+    content_changed_at = Column(DateTime, server_default=func.now())
     
     # Relationships
     matches = relationship("SearchMatch", back_populates="deal")
 
+# Longest description prefix list views show, plus one so they can tell it was cut
+DESCRIPTION_SNIPPET_LENGTH = 101
+
+class DealSummary:
+    """Read-only deal row for list views.
+    
+    Holds only the columns deal cards render; description is a snippet of
+    at most DESCRIPTION_SNIPPET_LENGTH characters, cut in the database so the
+    full HTML is never fetched.
+    """
+    __slots__ = (
+        'id', 'title', 'url', 'description', 'store', 'category', 'price',
+        'discount_percentage', 'votes', 'comments_count', 'created_at', 'updated_at',
+    )
+    
+    def __init__(self, row):
+        for name, value in zip(self.__slots__, row):
+            setattr(self, name, value)
+    
+    @staticmethod
+    def columns():
+        return (
+            Deal.id, Deal.title, Deal.url,
+            func.substr(Deal.description, 1, DESCRIPTION_SNIPPET_LENGTH).label('description'),
+            Deal.store, Deal.category, Deal.price, Deal.discount_percentage,
+            Deal.votes, Deal.comments_count, Deal.created_at, Deal.updated_at,
+        )
+
 class SearchMatch(Base):
     __tablename__ = 'search_matches'
     
@@ -76,11 +121,20 @@ class ScrapingLog(Base):
     deals_found = Column(Integer, default=0)
     new_deals = Column(Integer, default=0)
     updated_deals = Column(Integer, default=0)
+    unchanged_deals = Column(Integer, default=0)
     status = Column(String(20), default='success')
     error_message = Column(Text)
     scrape_duration = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class FeedCache(Base):
+    __tablename__ = 'feed_cache'
+    
+    feed_url = Column(Text, primary_key=True)
+    etag = Column(Text)
+    last_modified = Column(Text)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class MatchingJob(Base):
     __tablename__ = 'matching_jobs'
     
@@ -91,8 +145,75 @@ class MatchingJob(Base):
     scheduled_at = Column(DateTime, nullable=False)
     executed_at = Column(DateTime)
     error_message = Column(Text)
+    claimed_by = Column(String(255))
+    lease_expires_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class MatcherWatermark(Base):
+    __tablename__ = 'matcher_watermarks'
+    
+    name = Column(String(50), primary_key=True)
+    # deals.content_changed_at of the last deal matched
+    last_updated_at = Column(DateTime, nullable=False)
+    last_deal_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class RematchCheckpoint(Base):
+    __tablename__ = 'rematch_checkpoints'
+    
+    run_key = Column(String(64), primary_key=True)
+    shard_start = Column(Integer, primary_key=True)
+    shard_end = Column(Integer, nullable=False)
+    last_deal_id = Column(Integer, nullable=False)
+    deals_processed = Column(Integer, nullable=False, default=0)
+    matches_created = Column(Integer, nullable=False, default=0)
+    completed = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Store(Base):
+    __tablename__ = 'stores'
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False, unique=True)
+    # Maintained by triggers; see reconcile_store_deals() in migration 015
+    live_deals = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class DealStat(Base):
+    __tablename__ = 'deal_stats'
+    
+    # Maintained by triggers; see reconcile_deal_stats() in migration 014
+    name = Column(String(50), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+def _hash_fields(fields):
+    content = '\x1f'.join('' if value is None else str(value) for value in fields)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def deal_fingerprint(deal_data):
+    """Hash the scraped fields whose change is worth rewriting a deal for"""
+    return _hash_fields((
+        deal_data.get('title'),
+        deal_data.get('description'),
+        deal_data.get('price'),
+        deal_data.get('votes'),
+        deal_data.get('comments_count'),
+    ))
+
+def match_fingerprint(deal_data):
+    """Hash the fields search terms are scored on; a change sends the deal back through matching"""
+    return _hash_fields((
+        deal_data.get('title'),
+        deal_data.get('description'),
+        deal_data.get('store'),
+    ))
+
+def like_contains_pattern(value):
+    """LIKE pattern matching value anywhere, with wildcards in value escaped"""
+    escaped = value.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
 # Base Database Manager
 class BaseDatabaseManager:
     """Base database manager with common functionality"""
@@ -116,6 +237,362 @@ class BaseDatabaseManager:
                 return session.query(SearchTerm).filter(SearchTerm.is_active == True).order_by(SearchTerm.created_at.desc()).all()
         finally:
             session.close()
+    
+    def get_search_terms_version(self):
+        """High-water mark of the search_terms table as (row count, latest updated_at)"""
+        session = self.get_session()
+        try:
+            count, last_updated = session.query(func.count(SearchTerm.id), func.max(SearchTerm.updated_at)).one()
+            return count, last_updated
+        finally:
+            session.close()
+    
+    def save_search_matches_bulk(self, matches):
+        """Insert (deal_id, search_term_id, match_score) tuples in one statement, skipping existing pairs"""
+        if not matches:
+            return 0
+        
+        session = self.get_session()
+        try:
+            stmt = pg_insert(SearchMatch.__table__).values([
+                {'deal_id': deal_id, 'search_term_id': search_term_id, 'match_score': match_score}
+                for deal_id, search_term_id, match_score in matches
+            ]).on_conflict_do_nothing(index_elements=['deal_id', 'search_term_id'])
+            result = session.execute(stmt)
+            session.commit()
+            return result.rowcount
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving {len(matches)} search matches: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def get_deal_chunk(self, after_id=0, limit=1000, until_id=None, since=None):
+        """Active deals with id above after_id as (id, title, description, store) rows.
+        
+        until_id caps the ids (inclusive) and since limits the chunk to deals
+        created on or after that time.
+        """
+        session = self.get_session()
+        try:
+            query = session.query(Deal.id, Deal.title, Deal.description, Deal.store).filter(
+                Deal.id > after_id,
+                Deal.is_active == True
+            )
+            if until_id is not None:
+                query = query.filter(Deal.id <= until_id)
+            if since is not None:
+                query = query.filter(Deal.created_at >= since)
+            return query.order_by(Deal.id).limit(limit).all()
+        finally:
+            session.close()
+    
+    def get_deal_id_range(self, since=None):
+        """(min id, max id, count) of the active deals, optionally created since a time"""
+        session = self.get_session()
+        try:
+            query = session.query(func.min(Deal.id), func.max(Deal.id), func.count(Deal.id)).filter(
+                Deal.is_active == True
+            )
+            if since is not None:
+                query = query.filter(Deal.created_at >= since)
+            return query.one()
+        finally:
+            session.close()
+    
+    def listen(self, *channels):
+        """Open a dedicated autocommit DBAPI connection LISTENing on the channels"""
+        connection = self.engine.raw_connection()
+        dbapi_connection = connection.driver_connection
+        # Keep this connection out of the pool; it lives as long as the listener
+        connection.detach()
+        dbapi_connection.autocommit = True
+        with dbapi_connection.cursor() as cursor:
+            for channel in channels:
+                cursor.execute(f"LISTEN {channel}")
+        return dbapi_connection
+    
+    def get_deal_stats(self):
+        """Trigger-maintained counters as a {name: value} dict"""
+        session = self.get_session()
+        try:
+            return dict(session.query(DealStat.name, DealStat.value).all())
+        finally:
+            session.close()
+    
+    def reconcile_deal_stats(self):
+        """Recount the statistics counters and per-store live deal counts and fix any drift;
+        returns the number of counters corrected"""
+        session = self.get_session()
+        try:
+            corrected = session.execute(text("SELECT reconcile_deal_stats() + reconcile_store_deals()")).scalar()
+            session.commit()
+            return corrected
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error reconciling deal stats: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def get_rematch_checkpoints(self, run_key):
+        """Checkpoints of a rematch run, ordered by shard"""
+        session = self.get_session()
+        try:
+            return session.query(RematchCheckpoint).filter(
+                RematchCheckpoint.run_key == run_key
+            ).order_by(RematchCheckpoint.shard_start).all()
+        finally:
+            session.close()
+    
+    def save_rematch_checkpoint(self, run_key, shard_start, shard_end, last_deal_id,
+                                deals_processed, matches_created, completed=False):
+        """Record how far a rematch shard has progressed"""
+        session = self.get_session()
+        try:
+            values = {
+                'run_key': run_key,
+                'shard_start': shard_start,
+                'shard_end': shard_end,
+                'last_deal_id': last_deal_id,
+                'deals_processed': deals_processed,
+                'matches_created': matches_created,
+                'completed': completed,
+                'updated_at': func.now()
+            }
+            stmt = pg_insert(RematchCheckpoint.__table__).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['run_key', 'shard_start'],
+                set_={key: stmt.excluded[key] for key in values if key not in ('run_key', 'shard_start')}
+            )
+            session.execute(stmt)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving rematch checkpoint for shard {shard_start}: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def clear_rematch_checkpoints(self, run_key):
+        """Forget the checkpoints of a rematch run"""
+        session = self.get_session()
+        try:
+            deleted = session.query(RematchCheckpoint).filter(RematchCheckpoint.run_key == run_key).delete()
+            session.commit()
+            return deleted
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error clearing rematch checkpoints: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def copy_search_matches(self, deal_ids, search_term_ids, scores):
+        """Bulk-load matches with COPY into a staging table, skipping existing pairs.
+        
+        Returns the number of matches created.
+        """
+        if not len(deal_ids):
+            return 0
+        
+        rows = '\n'.join(
+            f"{int(deal_id)}\t{int(search_term_id)}\t{float(score)!r}"
+            for deal_id, search_term_id, score in zip(deal_ids, search_term_ids, scores)
+        )
+        
+        connection = self.engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    CREATE TEMP TABLE IF NOT EXISTS search_matches_staging (
+                        deal_id INTEGER,
+                        search_term_id INTEGER,
+                        match_score DOUBLE PRECISION
+                    ) ON COMMIT DELETE ROWS
+                """)
+                cursor.copy_expert(
+                    "COPY search_matches_staging (deal_id, search_term_id, match_score) FROM STDIN",
+                    io.StringIO(rows)
+                )
+                cursor.execute("""
+                    INSERT INTO search_matches (deal_id, search_term_id, match_score, created_at)
+                    SELECT deal_id, search_term_id, match_score, NOW()
+                    FROM search_matches_staging
+                    ON CONFLICT (deal_id, search_term_id) DO NOTHING
+                """)
+                created = cursor.rowcount
+            connection.commit()
+            return created
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"Error copying {len(deal_ids)} search matches: {e}")
+            raise
+        finally:
+            connection.close()
+    
+    def _match_search_term(self, session, search_term_id):
+        """Insert matches between one active search term and live deals.
+
+        The term is bound as a literal LIKE pattern against LOWER(column), so
+        the planner can use the pg_trgm expression indexes on deals instead of
+        scanning the whole table. Returns the number of matches created.
+        """
+        term = session.query(SearchTerm.term).filter(
+            SearchTerm.id == search_term_id,
+            SearchTerm.is_active == True
+        ).scalar()
+        if not term:
+            return 0
+        
+        sql = text("""
+            INSERT INTO search_matches (deal_id, search_term_id, match_score, created_at)
+            SELECT 
+                d.id,
+                :search_term_id,
+                CASE 
+                    WHEN LOWER(d.title) LIKE :pattern THEN 0.8
+                    WHEN LOWER(d.store) LIKE :pattern THEN 0.5
+                    ELSE 0.4
+                END,
+                NOW()
+            FROM deals d
+            WHERE d.is_live
+            AND (
+                LOWER(d.title) LIKE :pattern OR
+                LOWER(d.store) LIKE :pattern OR
+                LOWER(d.description) LIKE :pattern
+            )
+            ON CONFLICT (deal_id, search_term_id) DO NOTHING
+        """)
+        
+        result = session.execute(sql, {
+            'search_term_id': search_term_id,
+            'pattern': like_contains_pattern(term)
+        })
+        return result.rowcount
+
+    def _match_search_terms(self, session, search_term_ids):
+        """Insert matches for many search terms in a single pass over deals.
+        
+        One LIKE ANY query over every term's pattern picks the candidate live
+        deals, through the same pg_trgm expression indexes as
+        _match_search_term, and only those are streamed. Each term is then
+        found with one Aho-Corasick scan per column, so the cost of a batch
+        barely grows with the number of terms. Columns are lowercased by
+        PostgreSQL and scored exactly like _match_search_term. Returns
+        {search_term_id: matches created} for every active term.
+        """
+        terms = session.query(SearchTerm.id, SearchTerm.term).filter(
+            SearchTerm.id.in_(search_term_ids),
+            SearchTerm.is_active == True
+        ).all()
+        if not terms:
+            return {}
+        
+        # Lowercased term -> ids of the terms sharing it
+        pattern_terms = {}
+        for term_id, term in terms:
+            pattern_terms.setdefault(term.lower(), []).append(term_id)
+        automaton = AhoCorasickAutomaton(pattern_terms)
+        
+        # Only deals containing some term; the scan below decides which and how they score
+        deals = session.execute(text("""
+            SELECT d.id, LOWER(d.title) AS title, LOWER(d.store) AS store, LOWER(d.description) AS description
+            FROM deals d
+            WHERE d.is_live
+            AND (
+                LOWER(d.title) LIKE ANY(CAST(:patterns AS text[])) OR
+                LOWER(d.store) LIKE ANY(CAST(:patterns AS text[])) OR
+                LOWER(d.description) LIKE ANY(CAST(:patterns AS text[]))
+            )
+        """).execution_options(yield_per=1000), {
+            'patterns': [like_contains_pattern(pattern) for pattern in pattern_terms]
+        })
+        
+        deal_ids, term_ids, scores = [], [], []
+        for deal in deals:
+            in_title = automaton.find(deal.title)
+            in_store = automaton.find(deal.store) if deal.store else set()
+            in_description = automaton.find(deal.description) if deal.description else set()
+            
+            for pattern in in_title | in_store | in_description:
+                if pattern in in_title:
+                    score = 0.8
+                elif pattern in in_store:
+                    score = 0.5
+                else:
+                    score = 0.4
+                for term_id in pattern_terms[pattern]:
+                    deal_ids.append(deal.id)
+                    term_ids.append(term_id)
+                    scores.append(score)
+        
+        created = {term_id: 0 for term_id, _ in terms}
+        if deal_ids:
+            result = session.execute(text("""
+                INSERT INTO search_matches (deal_id, search_term_id, match_score, created_at)
+                SELECT deal_id, search_term_id, match_score, NOW()
+                FROM unnest(
+                    CAST(:deal_ids AS integer[]),
+                    CAST(:term_ids AS integer[]),
+                    CAST(:scores AS numeric[])
+                ) AS m(deal_id, search_term_id, match_score)
+                ON CONFLICT (deal_id, search_term_id) DO NOTHING
+                RETURNING search_term_id
+            """), {'deal_ids': deal_ids, 'term_ids': term_ids, 'scores': scores})
+            for row in result:
+                created[row.search_term_id] += 1
+        return created
+
+class StoreFacetCache:
+    """In-process snapshot of the store filter list, reloaded after ttl seconds"""
+    
+    def __init__(self, db_manager, ttl=300, min_deals=2):
+        self.db = db_manager
+        self.ttl = ttl
+        self.min_deals = min_deals
+        self.loaded_at = None
+        self.stores = []
+        self.by_id = {}
+    
+    def get(self):
+        """Return the stores with enough live deals, most deals first"""
+        now = time.monotonic()
+        if self.loaded_at is None or now - self.loaded_at >= self.ttl:
+            stores = self.db.get_available_stores(min_deals=self.min_deals)
+            self.stores, self.by_id = stores, {store.id: store for store in stores}
+            self.loaded_at = now
+        return self.stores
+    
+    def name_of(self, store_id):
+        """Name of a store in the list, or None"""
+        self.get()
+        store = self.by_id.get(store_id)
+        return store.name if store else None
+
+class SearchTermCache:
+    """Versioned in-memory snapshot of the active search terms.
+
+    The snapshot is only reloaded when the search_terms high-water mark
+    moves, so asking for the terms once per batch costs a single aggregate
+    query instead of loading every term for every deal.
+    """
+    
+    def __init__(self, db_manager):
+        self.db = db_manager
+        self.version = None
+        self.terms = []
+    
+    def get(self):
+        """Return the active search terms, refreshing them if they changed"""
+        version = self.db.get_search_terms_version()
+        if version != self.version:
+            self.terms = self.db.get_search_terms()
+            self.version = version
+            logger.info(f"Loaded {len(self.terms)} active search terms")
+        return self.terms
 
 # Scraper Database Manager
 class ScraperDatabaseManager(BaseDatabaseManager):
@@ -124,19 +601,32 @@ class ScraperDatabaseManager(BaseDatabaseManager):
     def save_deal(self, deal_data):
         session = self.get_session()
         try:
+            content_hash = deal_fingerprint(deal_data)
+            match_hash = match_fingerprint(deal_data)
+            
             # Check if deal already exists
             existing_deal = session.query(Deal).filter(Deal.url == deal_data['url']).first()
             
             if existing_deal:
+                # Skip the write entirely when nothing we track has changed
+                if existing_deal.content_hash == content_hash and existing_deal.match_hash == match_hash:
+                    return existing_deal, False
+                
+                # Votes and comments move on most scrapes; only what matching reads requires a rematch
+                if existing_deal.match_hash != match_hash:
+                    existing_deal.content_changed_at = func.now()
+                
                 # Update existing deal
                 for key, value in deal_data.items():
                     setattr(existing_deal, key, value)
+                existing_deal.content_hash = content_hash
+                existing_deal.match_hash = match_hash
                 existing_deal.updated_at = datetime.utcnow()
                 session.commit()
                 return existing_deal, False
             else:
                 # Create new deal
-                new_deal = Deal(**deal_data)
+                new_deal = Deal(content_hash=content_hash, match_hash=match_hash, **deal_data)
                 session.add(new_deal)
                 session.commit()
                 return new_deal, True
@@ -147,6 +637,73 @@ class ScraperDatabaseManager(BaseDatabaseManager):
         finally:
             session.close()
     
+    def save_deals_bulk(self, deals):
+        """Upsert a batch of deals in a single transaction.
+
+        Returns a list of (deal_id, status) tuples in the same order as the
+        input, where status is 'new', 'updated' or 'unchanged'. Deals whose
+        content and match fingerprints match the stored ones are not
+        rewritten, and their deal_id is None. content_changed_at only moves
+        when the match fingerprint changes.
+        """
+        if not deals:
+            return []
+        
+        # ON CONFLICT cannot touch the same row twice in one statement, so
+        # collapse duplicate URLs within the batch (last entry wins)
+        rows_by_url = {}
+        for deal_data in deals:
+            rows_by_url[deal_data['url']] = dict(
+                deal_data, content_hash=deal_fingerprint(deal_data), match_hash=match_fingerprint(deal_data)
+            )
+        rows = list(rows_by_url.values())
+        
+        session = self.get_session()
+        try:
+            stmt = pg_insert(Deal.__table__).values(rows)
+            update_columns = {
+                key: stmt.excluded[key] for key in rows[0].keys() if key != 'url'
+            }
+            deals_table = Deal.__table__
+            match_changed = deals_table.c.match_hash.is_distinct_from(stmt.excluded.match_hash)
+            update_columns['updated_at'] = func.now()
+            update_columns['content_changed_at'] = case(
+                (match_changed, func.now()), else_=deals_table.c.content_changed_at
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Deal.url],
+                set_=update_columns,
+                # Rows whose content is unchanged are left untouched (no new tuple version)
+                where=or_(deals_table.c.content_hash.is_distinct_from(stmt.excluded.content_hash), match_changed)
+            ).returning(
+                Deal.id,
+                Deal.url,
+                literal_column('(xmax = 0)').label('inserted')
+            )
+            
+            result = session.execute(stmt)
+            saved = {row.url: (row.id, row.inserted) for row in result}
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error bulk saving {len(rows)} deals: {e}")
+            raise
+        finally:
+            session.close()
+        
+        # Report each URL as new/updated only once, even if it appeared twice in the batch
+        results = []
+        reported = set()
+        for deal_data in deals:
+            url = deal_data['url']
+            if url not in saved or url in reported:
+                results.append((None, 'unchanged'))
+            else:
+                deal_id, inserted = saved[url]
+                results.append((deal_id, 'new' if inserted else 'updated'))
+            reported.add(url)
+        return results
+    
     def save_search_match(self, deal_id, search_term_id, match_score):
         session = self.get_session()
         try:
@@ -171,6 +728,58 @@ class ScraperDatabaseManager(BaseDatabaseManager):
         finally:
             session.close()
     
+    def get_feed_cache(self, feed_url):
+        """Get the stored (etag, last_modified) validators for a feed"""
+        session = self.get_session()
+        try:
+            cache = session.query(FeedCache).filter(FeedCache.feed_url == feed_url).first()
+            if cache:
+                return cache.etag, cache.last_modified
+            return None, None
+        finally:
+            session.close()
+    
+    def save_feed_cache(self, feed_url, etag, last_modified):
+        """Store the validators returned with the latest copy of a feed"""
+        session = self.get_session()
+        try:
+            stmt = pg_insert(FeedCache.__table__).values(
+                feed_url=feed_url,
+                etag=etag,
+                last_modified=last_modified,
+                updated_at=datetime.utcnow()
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[FeedCache.feed_url],
+                set_={
+                    'etag': stmt.excluded.etag,
+                    'last_modified': stmt.excluded.last_modified,
+                    'updated_at': stmt.excluded.updated_at
+                }
+            )
+            session.execute(stmt)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving feed cache for {feed_url}: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def sweep_expired_deals(self):
+        """Clear is_live on deals whose expiry date has passed; returns the number swept"""
+        session = self.get_session()
+        try:
+            swept = session.execute(text("SELECT sweep_expired_deals()")).scalar()
+            session.commit()
+            return swept
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error sweeping expired deals: {e}")
+            raise
+        finally:
+            session.close()
+    
     def log_scraping_activity(self, log_data):
         session = self.get_session()
         try:
@@ -194,11 +803,138 @@ class MatcherDatabaseManager(BaseDatabaseManager):
         try:
             return session.query(MatchingJob).filter(
                 MatchingJob.status == 'pending',
-                MatchingJob.scheduled_at <= datetime.utcnow()
+                MatchingJob.scheduled_at <= func.now()
             ).all()
         finally:
             session.close()
     
+    def claim_jobs(self, worker_id, limit=1, lease_seconds=600):
+        """Atomically claim up to `limit` due jobs for this worker.
+        
+        Rows locked by another replica are skipped rather than waited on, so
+        concurrent matchers never claim the same job. Running jobs whose lease
+        has expired (their worker crashed) are reclaimed.
+        """
+        session = self.get_session()
+        try:
+            jobs = session.execute(text("""
+                UPDATE matching_jobs
+                SET status = 'running',
+                    executed_at = NOW(),
+                    claimed_by = :worker_id,
+                    lease_expires_at = NOW() + make_interval(secs => :lease_seconds)
+                WHERE id IN (
+                    SELECT id FROM matching_jobs
+                    WHERE (status = 'pending' AND scheduled_at <= NOW())
+                    OR (
+                        status = 'running'
+                        AND COALESCE(lease_expires_at, executed_at + make_interval(secs => :lease_seconds)) < NOW()
+                    )
+                    ORDER BY scheduled_at
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, search_term_id, job_type, scheduled_at, claimed_by
+            """), {
+                'worker_id': worker_id,
+                'limit': limit,
+                'lease_seconds': lease_seconds
+            }).all()
+            session.commit()
+            return jobs
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error claiming matching jobs: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def get_seconds_until_next_job(self):
+        """Seconds until a job is due or a lease expires (negative if overdue), or None"""
+        session = self.get_session()
+        try:
+            delay = session.execute(text("""
+                SELECT EXTRACT(EPOCH FROM (MIN(due_at) - NOW()))
+                FROM (
+                    SELECT scheduled_at AS due_at FROM matching_jobs WHERE status = 'pending'
+                    UNION ALL
+                    SELECT lease_expires_at FROM matching_jobs WHERE status = 'running'
+                ) due
+            """)).scalar()
+            return float(delay) if delay is not None else None
+        finally:
+            session.close()
+    
+    def get_watermark(self, name):
+        """Return (content_changed_at, deal_id) of a matcher watermark, or None"""
+        session = self.get_session()
+        try:
+            watermark = session.query(MatcherWatermark).filter(MatcherWatermark.name == name).first()
+            if watermark is None:
+                return None
+            return watermark.last_updated_at, watermark.last_deal_id
+        finally:
+            session.close()
+    
+    def get_deals_changed_since(self, changed_at, deal_id, limit=500):
+        """Live deals after the (content_changed_at, id) position, in that order.
+        
+        Only inserts and changes to the title, description or store move
+        content_changed_at, so vote counts, expiry checks and other
+        bookkeeping writes do not send deals back here.
+        """
+        session = self.get_session()
+        try:
+            return session.execute(text("""
+                SELECT id, title, description, store, content_changed_at
+                FROM deals
+                WHERE (content_changed_at, id) > (:changed_at, :deal_id)
+                AND is_live
+                ORDER BY content_changed_at, id
+                LIMIT :limit
+            """), {'changed_at': changed_at, 'deal_id': deal_id, 'limit': limit}).all()
+        finally:
+            session.close()
+    
+    def save_watermark(self, name, changed_at, deal_id, lag_seconds=60):
+        """Advance a watermark, holding it at least lag_seconds behind now.
+        
+        content_changed_at is stamped when a transaction starts, so a deal written by
+        a slow transaction can commit behind deals already matched. Keeping
+        the stored position behind the lag re-reads that window next time.
+        The watermark never moves backwards.
+        """
+        session = self.get_session()
+        try:
+            session.execute(text("""
+                INSERT INTO matcher_watermarks (name, last_updated_at, last_deal_id, updated_at)
+                SELECT :name, position.updated_at, position.deal_id, NOW()
+                FROM (
+                    SELECT
+                        CASE WHEN CAST(:changed_at AS timestamp) <= LOCALTIMESTAMP - make_interval(secs => :lag_seconds)
+                            THEN CAST(:changed_at AS timestamp)
+                            ELSE LOCALTIMESTAMP - make_interval(secs => :lag_seconds)
+                        END AS updated_at,
+                        CASE WHEN CAST(:changed_at AS timestamp) <= LOCALTIMESTAMP - make_interval(secs => :lag_seconds)
+                            THEN :deal_id
+                            ELSE 0
+                        END AS deal_id
+                ) position
+                ON CONFLICT (name) DO UPDATE SET
+                    last_updated_at = excluded.last_updated_at,
+                    last_deal_id = excluded.last_deal_id,
+                    updated_at = NOW()
+                WHERE (matcher_watermarks.last_updated_at, matcher_watermarks.last_deal_id)
+                    < (excluded.last_updated_at, excluded.last_deal_id)
+            """), {'name': name, 'changed_at': changed_at, 'deal_id': deal_id, 'lag_seconds': lag_seconds})
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving watermark {name}: {e}")
+            raise
+        finally:
+            session.close()
+    
     def mark_job_as_running(self, job_id):
         """Mark a job as currently running"""
         session = self.get_session()
@@ -215,14 +951,45 @@ class MatcherDatabaseManager(BaseDatabaseManager):
         finally:
             session.close()
     
-    def mark_job_as_completed(self, job_id):
-        """Mark a job as completed"""
+    def renew_leases(self, worker_id, job_ids, lease_seconds=600):
+        """Extend this worker's leases on running jobs; returns the ids it still holds"""
         session = self.get_session()
         try:
-            job = session.query(MatchingJob).filter(MatchingJob.id == job_id).first()
-            if job:
-                job.status = 'completed'
-                session.commit()
+            held = session.execute(text("""
+                UPDATE matching_jobs
+                SET lease_expires_at = NOW() + make_interval(secs => :lease_seconds)
+                WHERE id = ANY(:job_ids)
+                AND status = 'running'
+                AND claimed_by = :worker_id
+                RETURNING id
+            """), {'worker_id': worker_id, 'job_ids': list(job_ids), 'lease_seconds': lease_seconds}).scalars().all()
+            session.commit()
+            return set(held)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error renewing leases for worker {worker_id}: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def mark_job_as_completed(self, job_id, worker_id):
+        """Mark a job claimed by worker_id as completed.
+        
+        Returns False if the job is no longer this worker's, because its lease
+        expired and another worker reclaimed it.
+        """
+        session = self.get_session()
+        try:
+            updated = session.query(MatchingJob).filter(
+                MatchingJob.id == job_id,
+                MatchingJob.status == 'running',
+                MatchingJob.claimed_by == worker_id
+            ).update({
+                MatchingJob.status: 'completed',
+                MatchingJob.lease_expires_at: None
+            }, synchronize_session=False)
+            session.commit()
+            return updated > 0
         except Exception as e:
             session.rollback()
             logger.error(f"Error marking job as completed: {e}")
@@ -230,15 +997,21 @@ class MatcherDatabaseManager(BaseDatabaseManager):
         finally:
             session.close()
     
-    def mark_job_as_failed(self, job_id, error_message):
-        """Mark a job as failed with error message"""
+    def mark_job_as_failed(self, job_id, worker_id, error_message):
+        """Mark a job claimed by worker_id as failed; returns False if it is no longer this worker's"""
         session = self.get_session()
         try:
-            job = session.query(MatchingJob).filter(MatchingJob.id == job_id).first()
-            if job:
-                job.status = 'failed'
-                job.error_message = error_message
-                session.commit()
+            updated = session.query(MatchingJob).filter(
+                MatchingJob.id == job_id,
+                MatchingJob.status == 'running',
+                MatchingJob.claimed_by == worker_id
+            ).update({
+                MatchingJob.status: 'failed',
+                MatchingJob.error_message: error_message,
+                MatchingJob.lease_expires_at: None
+            }, synchronize_session=False)
+            session.commit()
+            return updated > 0
         except Exception as e:
             session.rollback()
             logger.error(f"Error marking job as failed: {e}")
@@ -255,49 +1028,12 @@ class MatcherDatabaseManager(BaseDatabaseManager):
             session.close()
     
     def run_matching_for_search_term(self, search_term_id):
-        """Run matching for a specific search term using SQL"""
-        session = self.get_session()
-        try:
-            # Use raw SQL for better performance
-            sql = text("""
-                WITH deal_matches AS (
-                    SELECT 
-                        d.id as deal_id,
-                        :search_term_id as search_term_id,
-                        CASE 
-                            WHEN LOWER(d.title) LIKE '%' || LOWER(st.term) || '%' THEN 0.8
-                            WHEN LOWER(d.store) LIKE '%' || LOWER(st.term) || '%' THEN 0.5
-                            WHEN LOWER(d.description) LIKE '%' || LOWER(st.term) || '%' THEN 0.4
-                            ELSE 0.0
-                        END as match_score
-                    FROM deals d
-                    CROSS JOIN search_terms st
-                    WHERE d.is_active = true 
-                    AND st.is_active = true
-                    AND st.id = :search_term_id
-                    AND LOWER(d.title) NOT LIKE '%expired%'
-                    AND LOWER(d.title) NOT LIKE '%(expired)%'
-                    AND (d.expiry_date IS NULL OR d.expiry_date > NOW())
-                    AND (
-                        LOWER(d.title) LIKE '%' || LOWER(st.term) || '%' OR
-                        LOWER(d.store) LIKE '%' || LOWER(st.term) || '%' OR
-                        LOWER(d.description) LIKE '%' || LOWER(st.term) || '%'
-                    )
-                )
-                INSERT INTO search_matches (deal_id, search_term_id, match_score, created_at)
-                SELECT deal_id, search_term_id, match_score, NOW()
-                FROM deal_matches
-                WHERE match_score > 0.3
-                AND NOT EXISTS (
-                    SELECT 1 FROM search_matches sm 
-                    WHERE sm.deal_id = deal_matches.deal_id 
-                    AND sm.search_term_id = deal_matches.search_term_id
-                )
-            """)
-            
-            result = session.execute(sql, {'search_term_id': search_term_id})
+        """Run matching for a specific search term using trigram-indexed SQL"""
+        session = self.get_session()
+        try:
+            matches_created = self._match_search_term(session, search_term_id)
             session.commit()
-            return result.rowcount
+            return matches_created
             
         except Exception as e:
             session.rollback()
@@ -306,6 +1042,68 @@ class MatcherDatabaseManager(BaseDatabaseManager):
         finally:
             session.close()
     
+    def run_matching_batch(self, jobs, worker_id):
+        """Run jobs claimed by worker_id with one matching pass and complete them together.
+        
+        Returns {job_id: (status, matches_created, error_message)}. Jobs whose
+        search term no longer exists fail individually; jobs for inactive
+        terms complete without matching. Jobs another worker has reclaimed
+        in the meantime are left to it.
+        """
+        session = self.get_session()
+        try:
+            term_ids = {job.search_term_id for job in jobs}
+            term_active = dict(session.query(SearchTerm.id, SearchTerm.is_active).filter(
+                SearchTerm.id.in_(term_ids)
+            ).all())
+            
+            active_ids = [term_id for term_id, is_active in term_active.items() if is_active]
+            if len(active_ids) == 1:
+                # One term is matched entirely in SQL, with no rows brought back to score
+                created = {active_ids[0]: self._match_search_term(session, active_ids[0])}
+            else:
+                created = self._match_search_terms(session, active_ids)
+            
+            outcomes = {}
+            for job in jobs:
+                if job.search_term_id not in term_active:
+                    outcomes[job.id] = ('failed', 0, f"Search term {job.search_term_id} not found")
+                else:
+                    outcomes[job.id] = ('completed', created.get(job.search_term_id, 0), None)
+            
+            completed_ids = [job_id for job_id, outcome in outcomes.items() if outcome[0] == 'completed']
+            if completed_ids:
+                session.query(MatchingJob).filter(
+                    MatchingJob.id.in_(completed_ids),
+                    MatchingJob.status == 'running',
+                    MatchingJob.claimed_by == worker_id
+                ).update({
+                    MatchingJob.status: 'completed',
+                    MatchingJob.lease_expires_at: None
+                }, synchronize_session=False)
+            
+            for job_id, (status, _, error_message) in outcomes.items():
+                if status == 'failed':
+                    session.query(MatchingJob).filter(
+                        MatchingJob.id == job_id,
+                        MatchingJob.status == 'running',
+                        MatchingJob.claimed_by == worker_id
+                    ).update({
+                        MatchingJob.status: 'failed',
+                        MatchingJob.error_message: error_message,
+                        MatchingJob.lease_expires_at: None
+                    }, synchronize_session=False)
+            
+            session.commit()
+            return outcomes
+            
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error running batched matching for {len(jobs)} jobs: {e}")
+            raise
+        finally:
+            session.close()
+    
     def cleanup_old_jobs(self, days_old=7):
         """Clean up old completed/failed jobs"""
         session = self.get_session()
@@ -329,57 +1127,91 @@ class WebDatabaseManager(BaseDatabaseManager):
     """Database manager for web service"""
     
     def get_recent_deals(self, limit=50, store_filter=None):
+        """Newest live deals as DealSummary rows"""
         session = self.get_session()
         try:
-            query = session.query(Deal).filter(
-                Deal.is_active == True,
-                ~Deal.title.ilike('%expired%'),  # Exclude deals marked as expired
-                ~Deal.title.ilike('%(expired)%'),  # Also exclude deals with (expired) pattern
-                (Deal.expiry_date.is_(None)) | (Deal.expiry_date > datetime.utcnow())  # Exclude past expiry dates
-            )
+            query = session.query(*DealSummary.columns()).filter(Deal.is_live == True)
             
             # Add store filter if provided
             if store_filter:
                 query = query.filter(Deal.store.ilike(f'%{store_filter}%'))
             
-            return query.order_by(desc(Deal.created_at)).limit(limit).all()
+            return [DealSummary(row) for row in query.order_by(desc(Deal.created_at)).limit(limit)]
         finally:
             session.close()
     
+    def get_deals_page(self, limit=20, store_filter=None, after=None, before=None, store_id=None):
+        """One page of live deals, newest first, using keyset pagination.
+        
+        after and before are (created_at, id) cursors of the last deal of the
+        previous page and the first deal of the next page respectively.
+        store_id selects one store exactly; store_filter matches store names
+        containing it. Returns (deals, has_prev, has_next) with deals as
+        DealSummary rows.
+        """
+        session = self.get_session()
+        try:
+            return self._deals_page(session, limit, store_filter, after, before, store_id)
+        finally:
+            session.close()
+    
+    def _deals_page(self, session, limit, store_filter=None, after=None, before=None, store_id=None):
+        """Keyset page query; one extra row tells whether there is a page beyond this one"""
+        query = session.query(*DealSummary.columns()).filter(Deal.is_live == True)
+        
+        if store_id is not None:
+            query = query.filter(Deal.store_id == store_id)
+        elif store_filter:
+            query = query.filter(Deal.store.ilike(f'%{store_filter}%'))
+        
+        if before is not None:
+            # Walk backwards from the cursor, then restore newest-first order
+            query = query.filter(tuple_(Deal.created_at, Deal.id) > tuple_(*before))
+            deals = [DealSummary(row) for row in query.order_by(Deal.created_at, Deal.id).limit(limit + 1)]
+            return list(reversed(deals[:limit])), len(deals) > limit, True
+        
+        if after is not None:
+            query = query.filter(tuple_(Deal.created_at, Deal.id) < tuple_(*after))
+        deals = [DealSummary(row) for row in query.order_by(desc(Deal.created_at), desc(Deal.id)).limit(limit + 1)]
+        return deals[:limit], after is not None, len(deals) > limit
+    
     def get_available_stores(self, min_deals=2):
         """Get list of stores with at least min_deals active deals"""
         session = self.get_session()
         try:
-            return session.query(Deal.store, func.count(Deal.id).label('deal_count')).filter(
-                Deal.is_active == True,
-                Deal.store.isnot(None),
-                ~Deal.title.ilike('%expired%'),
-                ~Deal.title.ilike('%(expired)%'),
-                (Deal.expiry_date.is_(None)) | (Deal.expiry_date > datetime.utcnow()),
-                func.length(Deal.store) > 3  # Filter out truncated store names
-            ).group_by(Deal.store).having(func.count(Deal.id) >= min_deals).order_by(desc(func.count(Deal.id))).all()
+            return session.query(Store).filter(
+                Store.live_deals >= min_deals,
+                func.length(Store.name) > 3  # Filter out truncated store names
+            ).order_by(desc(Store.live_deals), Store.name).all()
+        finally:
+            session.close()
+    
+    def get_store(self, store_id):
+        session = self.get_session()
+        try:
+            return session.query(Store).filter(Store.id == store_id).first()
         finally:
             session.close()
     
     def get_matched_deals(self, search_term_id=None, limit=50):
+        """Newest live deals matched by an active search term, as DealSummary rows"""
         session = self.get_session()
         try:
-            query = session.query(Deal).join(SearchMatch).join(SearchTerm).filter(
-                Deal.is_active == True,
-                SearchTerm.is_active == True,  # Only show matches for active search terms
-                ~Deal.title.ilike('%expired%'),  # Exclude deals marked as expired
-                ~Deal.title.ilike('%(expired)%')  # Also exclude deals with (expired) pattern
-            )
-            
-            # Also exclude deals with expiry_date in the past
-            query = query.filter(
-                (Deal.expiry_date.is_(None)) | (Deal.expiry_date > datetime.utcnow())
+            matched = session.query(SearchMatch.id).join(SearchTerm).filter(
+                SearchMatch.deal_id == Deal.id,
+                SearchTerm.is_active == True  # Only show matches for active search terms
             )
             
             if search_term_id:
-                query = query.filter(SearchMatch.search_term_id == search_term_id)
+                matched = matched.filter(SearchMatch.search_term_id == search_term_id)
             
-            return query.order_by(desc(Deal.created_at)).limit(limit).all()
+            # A semi-join lists each deal once however many terms matched it. The page
+            # is picked by id first so only its descriptions are read for snippets
+            page = session.query(Deal.id).filter(
+                Deal.is_live == True, matched.exists()
+            ).order_by(desc(Deal.created_at)).limit(limit).subquery()
+            query = session.query(*DealSummary.columns()).join(page, Deal.id == page.c.id)
+            return [DealSummary(row) for row in query.order_by(desc(Deal.created_at))]
         finally:
             session.close()
     
@@ -466,32 +1298,15 @@ class WebDatabaseManager(BaseDatabaseManager):
             session.close()
     
     def get_statistics(self):
-        session = self.get_session()
-        try:
-            stats = {}
-            stats['total_deals'] = session.query(Deal).count()
-            
+        counters = self.get_deal_stats()
+        return {
+            'total_deals': counters.get('total_deals', 0),
             # Active deals (excluding expired ones)
-            stats['active_deals'] = session.query(Deal).filter(
-                Deal.is_active == True,
-                ~Deal.title.ilike('%expired%'),
-                ~Deal.title.ilike('%(expired)%'),
-                (Deal.expiry_date.is_(None)) | (Deal.expiry_date > datetime.utcnow())
-            ).count()
-            
-            stats['search_terms'] = session.query(SearchTerm).filter(SearchTerm.is_active == True).count()
-            
+            'active_deals': counters.get('live_deals', 0),
+            'search_terms': counters.get('active_search_terms', 0),
             # Matched deals (excluding expired ones)
-            stats['matched_deals'] = session.query(SearchMatch).join(Deal).filter(
-                Deal.is_active == True,
-                ~Deal.title.ilike('%expired%'),
-                ~Deal.title.ilike('%(expired)%'),
-                (Deal.expiry_date.is_(None)) | (Deal.expiry_date > datetime.utcnow())
-            ).count()
-            
-            return stats
-        finally:
-            session.close()
+            'matched_deals': counters.get('live_matches', 0),
+        }
     
     def mark_deal_as_expired(self, deal_id):
         """Mark a deal as expired by setting expiry_date to past"""
@@ -512,16 +1327,7 @@ class WebDatabaseManager(BaseDatabaseManager):
     
     def get_expired_deals_count(self):
         """Get count of expired deals"""
-        session = self.get_session()
-        try:
-            return session.query(Deal).filter(
-                Deal.is_active == True,
-                ((Deal.title.ilike('%expired%')) | 
-                 (Deal.title.ilike('%(expired)%')) |
-                 ((Deal.expiry_date.isnot(None)) & (Deal.expiry_date <= datetime.utcnow())))
-            ).count()
-        finally:
-            session.close()
+        return self.get_deal_stats().get('expired_deals', 0)
     
     def purge_search_matches(self, search_term_id):
         """Purge all search matches for a specific search term"""
@@ -542,46 +1348,9 @@ class WebDatabaseManager(BaseDatabaseManager):
         """Run immediate matching for a search term using the same logic as matcher service"""
         session = self.get_session()
         try:
-            # Use the same SQL logic as the matcher service
-            sql = text("""
-                WITH deal_matches AS (
-                    SELECT 
-                        d.id as deal_id,
-                        :search_term_id as search_term_id,
-                        CASE 
-                            WHEN LOWER(d.title) LIKE '%' || LOWER(st.term) || '%' THEN 0.8
-                            WHEN LOWER(d.store) LIKE '%' || LOWER(st.term) || '%' THEN 0.5
-                            WHEN LOWER(d.description) LIKE '%' || LOWER(st.term) || '%' THEN 0.4
-                            ELSE 0.0
-                        END as match_score
-                    FROM deals d
-                    CROSS JOIN search_terms st
-                    WHERE d.is_active = true 
-                    AND st.is_active = true
-                    AND st.id = :search_term_id
-                    AND LOWER(d.title) NOT LIKE '%expired%'
-                    AND LOWER(d.title) NOT LIKE '%(expired)%'
-                    AND (d.expiry_date IS NULL OR d.expiry_date > NOW())
-                    AND (
-                        LOWER(d.title) LIKE '%' || LOWER(st.term) || '%' OR
-                        LOWER(d.store) LIKE '%' || LOWER(st.term) || '%' OR
-                        LOWER(d.description) LIKE '%' || LOWER(st.term) || '%'
-                    )
-                )
-                INSERT INTO search_matches (deal_id, search_term_id, match_score, created_at)
-                SELECT deal_id, search_term_id, match_score, NOW()
-                FROM deal_matches
-                WHERE match_score > 0.3
-                AND NOT EXISTS (
-                    SELECT 1 FROM search_matches sm 
-                    WHERE sm.deal_id = deal_matches.deal_id 
-                    AND sm.search_term_id = deal_matches.search_term_id
-                )
-            """)
-            
-            result = session.execute(sql, {'search_term_id': search_term_id})
+            matches_created = self._match_search_term(session, search_term_id)
             session.commit()
-            return result.rowcount
+            return matches_created
             
         except Exception as e:
             session.rollback()
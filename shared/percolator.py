@@ -0,0 +1,225 @@
+"""
+OzBargain Monitor - Search Term Percolator
+
+Matches a deal against every active search term at once. All terms, and the
+individual words of each term, are compiled into a single Aho-Corasick
+automaton, so each deal field is scanned once no matter how many terms exist.
+Scores follow the same rules as the scraper's per-term matching.
+"""
+
+from collections import deque
+
+# Scoring rules shared by every matching path
+TITLE_MATCH_SCORE = 0.8
+WORD_MATCH_SCORE = 0.3
+DESCRIPTION_MATCH_SCORE = 0.4
+STORE_MATCH_SCORE = 0.5
+MATCH_THRESHOLD = 0.3
+
+
+def calculate_match_score(term, title, description=None, store=None):
+    """Score one search term against one deal"""
+    term_lower = term.lower()
+    title_lower = title.lower()
+    description_lower = (description or '').lower()
+    store_lower = (store or '').lower()
+
+    score = 0.0
+
+    # Exact match in title gets highest score
+    if term_lower in title_lower:
+        score += TITLE_MATCH_SCORE
+
+    # Partial word match in title
+    for word in term_lower.split():
+        if word in title_lower:
+            score += WORD_MATCH_SCORE
+
+    # Match in description
+    if term_lower in description_lower:
+        score += DESCRIPTION_MATCH_SCORE
+
+    # Match in store name
+    if term_lower in store_lower:
+        score += STORE_MATCH_SCORE
+
+    # Normalize score to max 1.0
+    return min(score, 1.0)
+
+
+class AhoCorasickAutomaton:
+    """Finds which of a fixed set of patterns occur in a text in one pass"""
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.goto = [{}]
+        self.fail = [0]
+        # Pattern ending exactly at each state, and the nearest state on the
+        # failure chain that ends a pattern (-1 when there is none)
+        self.output = [None]
+        self.dict_link = [-1]
+
+        for pattern in self.patterns:
+            self._insert(pattern)
+        self._link()
+
+    def _insert(self, pattern):
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+                self.dict_link.append(-1)
+                self.goto[state][char] = next_state
+            state = next_state
+        self.output[state] = pattern
+
+    def _link(self):
+        """Compute failure and dictionary links breadth-first"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+
+                target = self.fail[child]
+                self.dict_link[child] = target if self.output[target] is not None else self.dict_link[target]
+
+    def find(self, text):
+        """Return the set of patterns that occur anywhere in text"""
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        dict_link = self.dict_link
+        found = set()
+
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            match = state if output[state] is not None else dict_link[state]
+            while match > 0:
+                pattern = output[match]
+                # Every shorter pattern on this chain was reported with it
+                if pattern in found:
+                    break
+                found.add(pattern)
+                match = dict_link[match]
+
+        return found
+
+
+class Percolator:
+    """Matches deals against a changing set of search terms.
+
+    Terms can be added and removed individually; the automaton is rebuilt
+    lazily on the next match, and only when the set of distinct patterns
+    actually changed.
+    """
+
+    def __init__(self, search_terms=()):
+        # term_id -> (lowercased term, list of its words)
+        self.terms = {}
+        # pattern -> ids of the terms that use it as the whole term or a word
+        self.pattern_terms = {}
+        self.automaton = None
+        self.sync(search_terms)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add_term(self, term_id, term):
+        """Add or replace a search term"""
+        if term_id in self.terms:
+            self.remove_term(term_id)
+
+        term_lower = term.lower()
+        words = term_lower.split()
+        self.terms[term_id] = (term_lower, words)
+
+        for pattern in {term_lower, *words}:
+            if not pattern:
+                continue
+            users = self.pattern_terms.get(pattern)
+            if users is None:
+                users = self.pattern_terms[pattern] = set()
+                self.automaton = None
+            users.add(term_id)
+
+    def remove_term(self, term_id):
+        """Remove a search term if present"""
+        entry = self.terms.pop(term_id, None)
+        if entry is None:
+            return
+
+        term_lower, words = entry
+        for pattern in {term_lower, *words}:
+            users = self.pattern_terms.get(pattern)
+            if users is None:
+                continue
+            users.discard(term_id)
+            if not users:
+                del self.pattern_terms[pattern]
+                self.automaton = None
+
+    def sync(self, search_terms):
+        """Make the term set equal to the given (term_id, term) pairs"""
+        wanted = {term_id: term for term_id, term in search_terms}
+
+        for term_id in list(self.terms):
+            if term_id not in wanted:
+                self.remove_term(term_id)
+
+        for term_id, term in wanted.items():
+            current = self.terms.get(term_id)
+            if current is None or current[0] != term.lower():
+                self.add_term(term_id, term)
+
+    def match(self, title, description=None, store=None):
+        """Return (term_id, score) for every term scoring above the threshold"""
+        if not self.terms:
+            return []
+
+        if self.automaton is None:
+            self.automaton = AhoCorasickAutomaton(self.pattern_terms)
+
+        in_title = self.automaton.find(title.lower())
+        in_description = self.automaton.find(description.lower()) if description else set()
+        in_store = self.automaton.find(store.lower()) if store else set()
+
+        candidates = set()
+        for pattern in in_title | in_description | in_store:
+            candidates.update(self.pattern_terms[pattern])
+
+        matches = []
+        for term_id in candidates:
+            term_lower, words = self.terms[term_id]
+
+            # Same additions, in the same order, as calculate_match_score
+            score = 0.0
+            if term_lower in in_title:
+                score += TITLE_MATCH_SCORE
+            for word in words:
+                if word in in_title:
+                    score += WORD_MATCH_SCORE
+            if term_lower in in_description:
+                score += DESCRIPTION_MATCH_SCORE
+            if term_lower in in_store:
+                score += STORE_MATCH_SCORE
+            score = min(score, 1.0)
+
+            if score > MATCH_THRESHOLD:
+                matches.append((term_id, score))
+
+        return matches
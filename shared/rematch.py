@@ -0,0 +1,160 @@
+"""
+OzBargain Monitor - Vectorized Rematch Engine
+
+Scores a chunk of deals against every active search term at once for full
+rematches of the deal history. Each distinct pattern (whole terms and their
+words) is coded as an integer row; one Aho-Corasick pass per deal field gives
+the rows present in it, and the terms x deals score matrix is then
+accumulated with NumPy. Scores follow calculate_match_score exactly,
+including the order of the float additions.
+"""
+
+import numpy as np
+
+try:
+    from .percolator import (
+        TITLE_MATCH_SCORE, WORD_MATCH_SCORE, DESCRIPTION_MATCH_SCORE, STORE_MATCH_SCORE,
+        MATCH_THRESHOLD, AhoCorasickAutomaton, calculate_match_score,
+    )
+except ImportError:
+    # Imported with the shared directory on sys.path
+    from percolator import (
+        TITLE_MATCH_SCORE, WORD_MATCH_SCORE, DESCRIPTION_MATCH_SCORE, STORE_MATCH_SCORE,
+        MATCH_THRESHOLD, AhoCorasickAutomaton, calculate_match_score,
+    )
+
+
+class PresenceFinder:
+    """Finds which of a fixed list of patterns occur in each of many texts"""
+
+    def __init__(self, patterns):
+        self.rows = {pattern: row for row, pattern in enumerate(patterns)}
+        # The empty string is in every text but the automaton never reports it
+        self.empty_row = self.rows.pop('', None)
+        self.automaton = AhoCorasickAutomaton(self.rows)
+        self.size = len(patterns)
+
+    def presence(self, texts):
+        """Boolean [pattern, text] matrix telling whether each pattern occurs in each text"""
+        rows = []
+        columns = []
+        for column, text in enumerate(texts):
+            if not text:
+                continue
+            found = self.automaton.find(text)
+            rows.extend(self.rows[pattern] for pattern in found)
+            columns.extend([column] * len(found))
+
+        presence = np.zeros((self.size, len(texts)), dtype=bool)
+        presence[rows, columns] = True
+        if self.empty_row is not None:
+            presence[self.empty_row] = True
+        return presence
+
+
+class RematchEngine:
+    """Scores chunks of deals against a fixed set of search terms"""
+
+    def __init__(self, search_terms):
+        self.term_ids = []
+        # Distinct lowercased patterns; terms and words refer to them by row
+        self.patterns = []
+        pattern_rows = {}
+
+        def row_of(pattern):
+            row = pattern_rows.get(pattern)
+            if row is None:
+                row = pattern_rows[pattern] = len(self.patterns)
+                self.patterns.append(pattern)
+            return row
+
+        term_rows = []
+        word_rows = []
+        for term_id, term in search_terms:
+            term_lower = term.lower()
+            self.term_ids.append(term_id)
+            term_rows.append(row_of(term_lower))
+            word_rows.append([row_of(word) for word in term_lower.split()])
+
+        # Full-term patterns are the only ones looked up in descriptions and stores
+        full_patterns = sorted(set(term_rows))
+        full_index = {row: i for i, row in enumerate(full_patterns)}
+        self.title_finder = PresenceFinder(self.patterns)
+        self.full_finder = PresenceFinder([self.patterns[row] for row in full_patterns])
+
+        self.term_ids = np.array(self.term_ids, dtype=np.int64)
+        self.term_rows = np.array(term_rows, dtype=np.int64)
+        self.full_term_rows = np.array([full_index[row] for row in term_rows], dtype=np.int64)
+
+        # Words padded to a rectangle; padding points at an extra all-False row
+        max_words = max((len(words) for words in word_rows), default=0)
+        self.word_rows = np.full((len(word_rows), max_words), len(self.patterns), dtype=np.int64)
+        for i, words in enumerate(word_rows):
+            self.word_rows[i, :len(words)] = words
+
+    def __len__(self):
+        return len(self.term_ids)
+
+    def score(self, deals):
+        """Score (id, title, description, store) rows against every term.
+
+        Returns (deal_ids, search_term_ids, scores) arrays for the pairs that
+        score above the match threshold.
+        """
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
+        if not deals or not len(self.term_ids):
+            return empty
+
+        deal_ids = np.fromiter((deal[0] for deal in deals), dtype=np.int64, count=len(deals))
+        titles = [deal[1].lower() for deal in deals]
+        descriptions = [(deal[2] or '').lower() for deal in deals]
+        stores = [(deal[3] or '').lower() for deal in deals]
+
+        in_title = self.title_finder.presence(titles)
+        in_title = np.vstack([in_title, np.zeros((1, len(deals)), dtype=bool)])
+        in_description = self.full_finder.presence(descriptions)
+        in_store = self.full_finder.presence(stores)
+
+        # Same additions, in the same order, as calculate_match_score; adding
+        # 0.0 for an absent pattern leaves the running score unchanged
+        scores = np.zeros((len(self.term_ids), len(deals)))
+        scores += TITLE_MATCH_SCORE * in_title[self.term_rows]
+        for k in range(self.word_rows.shape[1]):
+            scores += WORD_MATCH_SCORE * in_title[self.word_rows[:, k]]
+        scores += DESCRIPTION_MATCH_SCORE * in_description[self.full_term_rows]
+        scores += STORE_MATCH_SCORE * in_store[self.full_term_rows]
+        np.minimum(scores, 1.0, out=scores)
+
+        term_index, deal_index = np.nonzero(scores > MATCH_THRESHOLD)
+        if not len(term_index):
+            return empty
+        return deal_ids[deal_index], self.term_ids[term_index], scores[term_index, deal_index]
+
+
+def reference_matches(search_terms, deals):
+    """Matches from calculate_match_score, as a {(deal_id, term_id): score} dict"""
+    matches = {}
+    for deal_id, title, description, store in deals:
+        for term_id, term in search_terms:
+            score = calculate_match_score(term, title, description, store)
+            if score > MATCH_THRESHOLD:
+                matches[(deal_id, term_id)] = score
+    return matches
+
+
+def parity_mismatches(search_terms, deals, engine=None):
+    """Compare the engine with calculate_match_score on deals.
+
+    Returns a list of (deal_id, term_id, expected, actual) for every pair
+    where the two disagree; expected or actual is None for a missing match.
+    """
+    engine = engine or RematchEngine(search_terms)
+    deal_ids, term_ids, scores = engine.score(deals)
+    actual = dict(zip(zip(deal_ids.tolist(), term_ids.tolist()), scores.tolist()))
+    expected = reference_matches(search_terms, deals)
+
+    return [
+        (deal_id, term_id, expected.get((deal_id, term_id)), actual.get((deal_id, term_id)))
+        for deal_id, term_id in sorted(set(actual) | set(expected))
+        if expected.get((deal_id, term_id)) != actual.get((deal_id, term_id))
+    ]
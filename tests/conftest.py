@@ -0,0 +1,30 @@
+"""
+Test setup shared by all test modules.
+
+Puts the service directories on sys.path the way the containers see them:
+`database` resolves to the shared module, which the services' own
+database.py files only exec from /app/shared. Tests that need PostgreSQL
+read TEST_DATABASE_URL, a database with schema.sql and the migrations
+applied, and are skipped when it is not set. They clean up the rows they
+create.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Inserted in turn, so shared ends up first
+for directory in ('database', 'matcher', 'scraper', 'shared'):
+    sys.path.insert(0, os.path.join(ROOT, directory))
+sys.path.append(ROOT)
+
+
+@pytest.fixture(scope='session')
+def database_url():
+    url = os.getenv('TEST_DATABASE_URL')
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    return url
@@ -0,0 +1,55 @@
+"""
+The data_changed notification the web caches follow: sent once per commit
+that changes what the views show, and not for expiry check bookkeeping
+"""
+
+import select
+
+import pytest
+from sqlalchemy import text
+
+from database import DatabaseManager
+
+URL_PREFIX = 'https://test.invalid/data-changed/'
+
+
+@pytest.fixture
+def db(database_url):
+    db = DatabaseManager(database_url)
+    with db.engine.begin() as connection:
+        connection.execute(text("""
+            INSERT INTO deals (title, url)
+            SELECT 'Data changed deal ' || i, :prefix || i FROM generate_series(1, 5) AS i
+        """), {'prefix': URL_PREFIX})
+
+    yield db
+
+    with db.engine.begin() as connection:
+        connection.execute(text("DELETE FROM deals WHERE url LIKE :pattern"), {'pattern': URL_PREFIX + '%'})
+
+
+def notifications(db, statement):
+    """Number of data_changed notifications delivered for one committed statement"""
+    listener = db.listen('data_changed')
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(text(statement), {'pattern': URL_PREFIX + '%'})
+        select.select([listener], [], [], 0.5)
+        listener.poll()
+        return len(listener.notifies)
+    finally:
+        listener.close()
+
+
+@pytest.mark.parametrize('statement, expected', [
+    ("UPDATE deals SET last_checked = NOW(), next_check_at = NOW() + INTERVAL '1 hour', "
+     "last_active_at = NOW() WHERE url LIKE :pattern", 0),
+    ("UPDATE deals SET is_live = is_live WHERE url LIKE :pattern", 0),
+    ("UPDATE deals SET content_changed_at = NOW() WHERE url LIKE :pattern", 1),
+    # Vote counts are shown but do not move content_changed_at
+    ("UPDATE deals SET votes = 7, content_hash = md5(url) WHERE url LIKE :pattern", 1),
+    ("UPDATE deals SET is_live = FALSE WHERE url LIKE :pattern", 1),
+    ("DELETE FROM deals WHERE url LIKE :pattern", 1),
+])
+def test_only_visible_changes_notify(db, statement, expected):
+    assert notifications(db, statement) == expected
@@ -0,0 +1,53 @@
+"""
+Deal writes from the scraper: content_changed_at, the matcher's watermark,
+moves when the fields matching scores on change (title, description and
+store), and not for vote or comment counts that change on most scrapes
+"""
+
+import pytest
+from sqlalchemy import text
+
+from database import ScraperDatabaseManager
+
+URL = 'https://test.invalid/deal-fingerprints/1'
+
+
+@pytest.fixture
+def db(database_url):
+    db = ScraperDatabaseManager(database_url)
+    yield db
+    with db.engine.begin() as connection:
+        connection.execute(text("DELETE FROM deals WHERE url = :url"), {'url': URL})
+
+
+def stored(db):
+    with db.engine.connect() as connection:
+        return connection.execute(text(
+            "SELECT votes, store, content_changed_at FROM deals WHERE url = :url"
+        ), {'url': URL}).one()
+
+
+def save_bulk(db, deal_data):
+    db.save_deals_bulk([deal_data])
+
+
+def save_one(db, deal_data):
+    db.save_deal(deal_data)
+
+
+@pytest.mark.parametrize('save', [save_bulk, save_one])
+def test_content_changed_at_follows_matched_fields(db, save):
+    deal = {'url': URL, 'title': 'Cheap SSD at Amazon AU', 'description': '1TB NVMe', 'store': 'Amazon AU', 'votes': 3}
+    save(db, deal)
+    first = stored(db)
+
+    # A votes-only change is written, but matching has nothing new to look at
+    save(db, dict(deal, votes=40, comments_count=12))
+    votes_only = stored(db)
+    assert votes_only.votes == 40
+    assert votes_only.content_changed_at == first.content_changed_at
+
+    save(db, dict(deal, votes=40, comments_count=12, store='JB Hi-Fi'))
+    store_change = stored(db)
+    assert store_change.store == 'JB Hi-Fi'
+    assert store_change.content_changed_at > first.content_changed_at
@@ -0,0 +1,113 @@
+"""
+Expired deal checks against a local HTTP stand-in for deal pages: verdicts
+are recorded through the batch writer, and deals whose checks are
+inconclusive back off exponentially instead of staying due
+"""
+
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from sqlalchemy import text
+
+from expired_checker import ExpiredDealChecker
+
+PAGES = {
+    '/active': '<html><body><div class="node"><h2>Cheap SSD</h2><p>Still on sale</p></div></body></html>',
+    '/expired': '<html><body><div class="node"><h2>Cheap SSD</h2><p>Deal expired</p></div></body></html>',
+}
+
+
+class DealPageHandler(BaseHTTPRequestHandler):
+    # Paths answered with a server error until taken out
+    failing = set()
+
+    def do_GET(self):
+        if self.path in DealPageHandler.failing or self.path not in PAGES:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        body = PAGES[self.path].encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    DealPageHandler.failing = {'/flaky'}
+    PAGES['/flaky'] = PAGES['/active']
+    server = ThreadingHTTPServer(('127.0.0.1', 0), DealPageHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def checker(database_url, server_url):
+    checker = ExpiredDealChecker(database_url, requests_per_second=0, write_flush_interval=0.1)
+    with checker.engine.begin() as connection:
+        connection.execute(text("""
+            INSERT INTO deals (title, url, next_check_at)
+            SELECT 'Expiry test deal ' || path, :base || path, LOCALTIMESTAMP - INTERVAL '1 hour'
+            FROM unnest(ARRAY['/active', '/expired', '/flaky']) AS path
+        """), {'base': server_url})
+
+    yield checker
+
+    with checker.engine.begin() as connection:
+        connection.execute(text("DELETE FROM deals WHERE url LIKE :pattern"), {'pattern': server_url + '/%'})
+
+
+def check(checker, server_url, *paths):
+    """Check the deals at paths in one run; returns the run's results and each deal's row after it"""
+    deals = [checker.get_deal_by_url(server_url + path) for path in paths]
+    results = checker.check_deals_batch(deals)
+    return results, {path: checker.get_deal_by_url(server_url + path) for path in paths}
+
+
+def test_verdicts_are_recorded(checker, server_url):
+    results, rows = check(checker, server_url, '/active', '/expired')
+
+    assert {result['url']: (result['is_expired'], result['updated']) for result in results} == {
+        server_url + '/active': (False, True),
+        server_url + '/expired': (True, True),
+    }
+    assert rows['/active']['last_active_at'] == rows['/active']['last_checked']
+    assert rows['/active']['next_check_at'] > rows['/active']['last_checked']
+    assert rows['/expired']['expiry_date'] == rows['/expired']['last_checked']
+
+
+def test_inconclusive_checks_back_off_exponentially(checker, server_url):
+    waits = []
+    for failures in range(1, 4):
+        started = datetime.now()
+        results, rows = check(checker, server_url, '/flaky')
+        deal = rows['/flaky']
+
+        # No verdict, so the deal keeps its last one and is not counted as checked
+        assert results == []
+        assert (deal['check_failures'], deal['last_checked'], deal['expiry_date']) == (failures, None, None)
+        assert deal['next_check_at'] > datetime.now()
+        waits.append(deal['next_check_at'] - started)
+
+    policy = checker.policy
+    for failures, wait in enumerate(waits):
+        expected = timedelta(hours=policy.min_interval_hours * 2 ** failures)
+        assert expected <= wait <= expected + timedelta(seconds=30)
+
+    # A conclusive check resets the backoff
+    DealPageHandler.failing.clear()
+    results, rows = check(checker, server_url, '/flaky')
+    assert [result['is_expired'] for result in results] == [False]
+    assert rows['/flaky']['check_failures'] == 0
+    assert rows['/flaky']['last_active_at'] is not None
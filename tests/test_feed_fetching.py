@@ -0,0 +1,142 @@
+"""
+Feed fetching against a local HTTP stand-in for OzBargain: conditional GETs
+with ETags, and concurrent category cycles paced by the per-host limiter
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ozbargain_scraper import OzBargainScraper
+
+LATENCY = 0.2
+ETAG = '"feed-v1"'
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        FeedHandler.requests.append((self.path, self.headers.get('If-None-Match')))
+        time.sleep(LATENCY)
+
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+
+        items = ''.join(
+            f"<item><title>Deal {i} at Store</title><link>https://example.test{self.path}/{i}</link>"
+            f"<description>Deal {i}</description></item>"
+            for i in range(3)
+        )
+        body = f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed</title>{items}</channel></rss>'.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FeedDatabase:
+    """In-memory stand-in for the scraper's calls on ScraperDatabaseManager"""
+
+    def __init__(self):
+        self.feed_cache = {}
+        self.saved = []
+        self.logs = []
+
+    def get_feed_cache(self, feed_url):
+        return self.feed_cache.get(feed_url, (None, None))
+
+    def save_feed_cache(self, feed_url, etag, last_modified):
+        self.feed_cache[feed_url] = (etag, last_modified)
+
+    def save_deals_bulk(self, deals):
+        self.saved.append(deals)
+        return [(None, 'new') for _ in deals]
+
+    def log_scraping_activity(self, log_data):
+        self.logs.append(log_data)
+
+
+@pytest.fixture
+def server_url():
+    FeedHandler.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def timed_cycle(scraper, base_url):
+    start = time.perf_counter()
+    scraper.scrape_category_feeds(base_url=base_url)
+    return time.perf_counter() - start
+
+
+def test_unchanged_feed_is_not_stored_again(server_url):
+    db = FeedDatabase()
+    scraper = OzBargainScraper(db, max_workers=1, requests_per_second=100, burst=10)
+    feed_url = f"{server_url}/feed"
+
+    assert scraper.scrape_rss_feed(feed_url) == (3, 3, 0, 0)
+    assert db.feed_cache[feed_url] == (ETAG, None)
+
+    scraper.start_cycle()
+    assert scraper.scrape_rss_feed(feed_url) == (0, 0, 0, 0)
+
+    assert FeedHandler.requests == [('/feed', None), ('/feed', ETAG)]
+    assert len(db.saved) == 1
+    assert [log['status'] for log in db.logs] == ['success', 'not_modified']
+
+
+def test_category_cycle_revalidates_every_feed(server_url):
+    db = FeedDatabase()
+    scraper = OzBargainScraper(db, max_workers=5, requests_per_second=100, burst=10)
+
+    scraper.scrape_category_feeds(base_url=f"{server_url}/cat")
+    stored = len(db.saved)
+    FeedHandler.requests = []
+    scraper.start_cycle()
+    scraper.scrape_category_feeds(base_url=f"{server_url}/cat")
+
+    assert stored == 10
+    assert len(db.saved) == stored
+    assert len(FeedHandler.requests) == 10
+    assert all(etag == ETAG for _, etag in FeedHandler.requests)
+    assert db.logs[-1]['scrape_type'] == 'category_cycle'
+
+
+def test_concurrent_category_cycle_is_faster(server_url):
+    serial = timed_cycle(
+        OzBargainScraper(FeedDatabase(), max_workers=1, requests_per_second=100, burst=10),
+        f"{server_url}/cat"
+    )
+    concurrent = timed_cycle(
+        OzBargainScraper(FeedDatabase(), max_workers=5, requests_per_second=100, burst=10),
+        f"{server_url}/cat"
+    )
+
+    # Ten feeds at LATENCY each, one after another or five at a time
+    assert serial >= 10 * LATENCY
+    assert concurrent < serial / 2
+
+
+def test_category_cycle_keeps_to_the_host_rate(server_url):
+    scraper = OzBargainScraper(FeedDatabase(), max_workers=10, requests_per_second=5, burst=1)
+
+    elapsed = timed_cycle(scraper, f"{server_url}/cat")
+
+    # The first request spends the burst, the other nine wait for tokens
+    assert elapsed >= 9 / 5
+    assert len(FeedHandler.requests) == 10
@@ -0,0 +1,145 @@
+"""
+Matching job claims across concurrent workers: every job runs exactly once,
+leases are renewed while a job runs, and a worker that lost its lease cannot
+overwrite the new owner's outcome
+"""
+
+import threading
+import time
+from collections import Counter
+
+import pytest
+from sqlalchemy import text
+
+from database import MatcherDatabaseManager
+from matcher_service import MatcherService
+
+TERM_PREFIX = 'claim-test-'
+
+
+@pytest.fixture
+def due_jobs(database_url):
+    """Create search terms and make their matching jobs due; returns the job ids"""
+    db = MatcherDatabaseManager(database_url)
+
+    def create(count):
+        with db.engine.begin() as connection:
+            term_ids = connection.execute(text("""
+                INSERT INTO search_terms (term, is_active)
+                SELECT :prefix || i, TRUE FROM generate_series(1, :count) AS i
+                RETURNING id
+            """), {'prefix': TERM_PREFIX, 'count': count}).scalars().all()
+            # The new search term trigger schedules one job per term a few minutes out
+            return connection.execute(text("""
+                UPDATE matching_jobs SET scheduled_at = NOW()
+                WHERE search_term_id = ANY(:term_ids)
+                RETURNING id
+            """), {'term_ids': term_ids}).scalars().all()
+
+    yield create
+
+    with db.engine.begin() as connection:
+        connection.execute(text("DELETE FROM search_terms WHERE term LIKE :pattern"), {'pattern': TERM_PREFIX + '%'})
+
+
+def job_rows(database_url, job_ids):
+    with MatcherDatabaseManager(database_url).engine.connect() as connection:
+        return {row.id: row for row in connection.execute(text(
+            "SELECT id, status, claimed_by FROM matching_jobs WHERE id = ANY(:ids)"
+        ), {'ids': list(job_ids)})}
+
+
+def recording_service(database_url, worker_id, executions, lock, **kwargs):
+    """A MatcherService that records which jobs it runs"""
+    service = MatcherService(database_url, **kwargs)
+    service.worker_id = worker_id
+
+    process_job, process_batch = service.process_job, service.process_batch
+
+    def record_job(job):
+        with lock:
+            executions.append(job.id)
+        process_job(job)
+
+    def record_batch(jobs):
+        with lock:
+            executions.extend(job.id for job in jobs)
+        process_batch(jobs)
+
+    service.process_job, service.process_batch = record_job, record_batch
+    return service
+
+
+@pytest.mark.parametrize('batch_size', [0, 5])
+def test_concurrent_workers_run_each_job_once(database_url, due_jobs, batch_size):
+    job_ids = due_jobs(40)
+    executions, lock = [], threading.Lock()
+    services = [
+        recording_service(database_url, f"test-worker-{n}", executions, lock, workers=4, batch_size=batch_size)
+        for n in range(2)
+    ]
+
+    start = threading.Barrier(len(services))
+
+    def work(service):
+        start.wait()
+        service.process_pending_jobs()
+
+    threads = [threading.Thread(target=work, args=(service,)) for service in services]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    runs = Counter(job_id for job_id in executions if job_id in set(job_ids))
+    assert runs == Counter(job_ids)
+    assert all(row.status == 'completed' for row in job_rows(database_url, job_ids).values())
+
+
+def test_long_job_keeps_its_lease(database_url, due_jobs):
+    job_id, = due_jobs(1)
+    owner = MatcherService(database_url, lease_seconds=1)
+    owner.worker_id = 'test-owner'
+    other = MatcherDatabaseManager(database_url)
+
+    process_job = owner.process_job
+
+    def slow_job(job):
+        # Well past the one second lease
+        time.sleep(3)
+        process_job(job)
+
+    owner.process_job = slow_job
+    thread = threading.Thread(target=owner.process_pending_jobs)
+    thread.start()
+
+    while job_rows(database_url, [job_id])[job_id].claimed_by != 'test-owner':
+        time.sleep(0.05)
+
+    reclaimed = []
+    while thread.is_alive():
+        reclaimed.extend(job.id for job in other.claim_jobs('test-other', limit=10, lease_seconds=1))
+        time.sleep(0.2)
+    thread.join()
+
+    assert job_id not in reclaimed
+    row = job_rows(database_url, [job_id])[job_id]
+    assert (row.status, row.claimed_by) == ('completed', 'test-owner')
+
+
+def test_stale_worker_cannot_finish_a_reclaimed_job(database_url, due_jobs):
+    job_id, = due_jobs(1)
+    db = MatcherDatabaseManager(database_url)
+
+    assert job_id in {job.id for job in db.claim_jobs('test-stale', limit=10, lease_seconds=1)}
+    time.sleep(1.5)
+    assert job_id in {job.id for job in db.claim_jobs('test-fresh', limit=10, lease_seconds=60)}
+
+    assert db.renew_leases('test-stale', [job_id], 60) == set()
+    assert not db.mark_job_as_completed(job_id, 'test-stale')
+    assert not db.mark_job_as_failed(job_id, 'test-stale', 'timed out')
+    row = job_rows(database_url, [job_id])[job_id]
+    assert (row.status, row.claimed_by) == ('running', 'test-fresh')
+
+    assert db.mark_job_as_completed(job_id, 'test-fresh')
+    assert job_rows(database_url, [job_id])[job_id].status == 'completed'
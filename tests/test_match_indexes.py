@@ -0,0 +1,122 @@
+"""
+Query plans at 100k synthetic deals: term matching, one term or a batch,
+served by the pg_trgm expression indexes (migration 007), and deal listings
+by the partial is_live indexes. As in a long-running table, most seeded
+deals are expired
+"""
+
+from sqlalchemy import event, text
+
+import pytest
+
+from database import MatcherDatabaseManager, WebDatabaseManager
+
+URL_PREFIX = 'https://test.invalid/match-indexes/'
+DEALS = 100_000
+RARE_TERM = 'zyxwidget'
+
+
+@pytest.fixture(scope='module')
+def seeded(database_url):
+    db = MatcherDatabaseManager(database_url)
+    with db.engine.begin() as connection:
+        connection.execute(text("""
+            INSERT INTO deals (title, url, description, store, created_at, is_active)
+            SELECT
+                'Deal ' || i || CASE WHEN i % 1000 = 0 THEN ' ' || :term ELSE '' END || ' at Store ' || (i % 50),
+                :prefix || i,
+                'Synthetic deal number ' || i || ' with a longer description',
+                'Store ' || (i % 50),
+                LOCALTIMESTAMP - make_interval(mins => i),
+                i % 10 = 0
+            FROM generate_series(1, :count) AS i
+        """), {'term': RARE_TERM, 'prefix': URL_PREFIX, 'count': DEALS})
+        term_id = connection.execute(text(
+            "INSERT INTO search_terms (term, is_active) VALUES (:term, TRUE) RETURNING id"
+        ), {'term': RARE_TERM}).scalar()
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.execute(text("ANALYZE deals"))
+
+    yield term_id
+
+    with db.engine.begin() as connection:
+        connection.execute(text("DELETE FROM search_terms WHERE id = :id"), {'id': term_id})
+        connection.execute(text("DELETE FROM deals WHERE url LIKE :pattern"), {'pattern': URL_PREFIX + '%'})
+
+
+def explain(db, call, marker):
+    """Run call(), then EXPLAIN the first statement it sent containing marker"""
+    statements = []
+
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        result = call()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    statement, parameters = next(s for s in statements if marker in s[0])
+    with db.engine.connect() as connection:
+        plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    return result, list(plan_nodes(plan[0]['Plan']))
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from plan_nodes(child)
+
+
+def require_pg_trgm(db):
+    with db.engine.connect() as connection:
+        if not connection.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).scalar():
+            pytest.skip("pg_trgm is not installed")
+
+
+def test_term_matching_uses_trigram_indexes(database_url, seeded):
+    db = MatcherDatabaseManager(database_url)
+    require_pg_trgm(db)
+
+    created, nodes = explain(db, lambda: db.run_matching_for_search_term(seeded), 'INSERT INTO search_matches')
+
+    assert created == DEALS // 1000
+    indexes = {node.get('Index Name') for node in nodes}
+    assert {'idx_deals_title_lower_trgm', 'idx_deals_store_lower_trgm', 'idx_deals_description_lower_trgm'} <= indexes
+    assert not any(node['Node Type'] == 'Seq Scan' and node.get('Relation Name') == 'deals' for node in nodes)
+
+
+def test_batch_matching_prefilters_through_trigram_indexes(database_url, seeded):
+    db = MatcherDatabaseManager(database_url)
+    require_pg_trgm(db)
+
+    session = db.get_session()
+    try:
+        other_id = session.execute(text(
+            "INSERT INTO search_terms (term, is_active) VALUES (:term, TRUE) RETURNING id"
+        ), {'term': RARE_TERM + ' at store'}).scalar()
+
+        created, nodes = explain(db, lambda: db._match_search_terms(session, [seeded, other_id]), 'LIKE ANY')
+    finally:
+        session.rollback()
+        session.close()
+
+    assert created == {seeded: DEALS // 1000, other_id: DEALS // 1000}
+    indexes = {node.get('Index Name') for node in nodes}
+    assert {'idx_deals_title_lower_trgm', 'idx_deals_store_lower_trgm', 'idx_deals_description_lower_trgm'} <= indexes
+    assert not any(node['Node Type'] == 'Seq Scan' and node.get('Relation Name') == 'deals' for node in nodes)
+
+
+def test_deal_listing_uses_live_index(database_url, seeded):
+    web = WebDatabaseManager(database_url)
+
+    # The first page is a short walk down either created_at index; no full scan or sort
+    (deals, _, _), nodes = explain(web, lambda: web.get_deals_page(limit=20), 'FROM deals')
+    assert len(deals) == 20
+    assert any(node.get('Index Name') in ('idx_deals_live_created_at_id', 'idx_deals_created_at') for node in nodes)
+    assert not any(node['Node Type'] in ('Seq Scan', 'Sort') for node in nodes)
+
+    cursor = (deals[-1].created_at, deals[-1].id)
+    _, nodes = explain(web, lambda: web.get_deals_page(limit=20, after=cursor), 'FROM deals')
+    assert any(node.get('Index Name') == 'idx_deals_live_created_at_id' for node in nodes)
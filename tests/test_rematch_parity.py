@@ -0,0 +1,108 @@
+"""
+Parity of the vectorized rematch with calculate_match_score, the scoring the
+serial rematch applied pair by pair: on seeded synthetic corpora, and end to
+end through the sharded process pool of match_existing_deals.py
+"""
+
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import text
+
+from database import MatcherDatabaseManager
+from rematch import parity_mismatches, reference_matches
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+URL_PREFIX = 'https://test.invalid/rematch-parity/'
+TERM_PREFIX = 'parity-test-'
+
+WORDS = [
+    'samsung', 'ssd', 'nvme', '1tb', 'pro', 'apple', 'airpods', 'ipad', 'lego', 'nintendo',
+    'switch', 'oled', 'tv', 'lg', 'sony', 'headphones', 'coffee', 'machine', 'usb-c', 'a',
+]
+STORES = ['Amazon AU', 'JB Hi-Fi', 'Apple', 'Big W', 'Samsung', None, '']
+
+
+def corpus(seed, deal_count=400):
+    """Terms and (id, title, description, store) deals that overlap in awkward ways"""
+    rng = random.Random(seed)
+
+    def phrase(low, high):
+        words = rng.sample(WORDS, rng.randint(low, high))
+        return ' '.join(word.upper() if rng.random() < 0.2 else word for word in words)
+
+    # Single words, phrases, substrings of other words and repeated words
+    terms = [phrase(1, 3) for _ in range(40)] + ['pod', 'sam', 'tv tv', 'Apple  AirPods', 'x']
+    search_terms = list(enumerate(terms, start=1))
+
+    deals = []
+    for deal_id in range(1, deal_count + 1):
+        description = rng.choice([None, '', phrase(2, 8), f"<p>{phrase(1, 4)}</p>"])
+        deals.append((deal_id, f"{phrase(2, 6)} at {rng.choice(STORES) or 'store'}", description, rng.choice(STORES)))
+    return search_terms, deals
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_engine_matches_reference_scoring(seed):
+    search_terms, deals = corpus(seed)
+
+    assert len(reference_matches(search_terms, deals)) > 100
+    assert parity_mismatches(search_terms, deals) == []
+
+
+@pytest.fixture
+def seeded(database_url):
+    search_terms, deals = corpus(4, deal_count=2000)
+    db = MatcherDatabaseManager(database_url)
+
+    with db.engine.begin() as connection:
+        term_ids = connection.execute(text("""
+            INSERT INTO search_terms (term, is_active)
+            SELECT term, TRUE FROM unnest(CAST(:terms AS text[])) AS term
+            RETURNING id
+        """), {'terms': [term for _, term in search_terms]}).scalars().all()
+        for deal_id, title, description, store in deals:
+            connection.execute(text(
+                "INSERT INTO deals (title, url, description, store) VALUES (:title, :url, :description, :store)"
+            ), {'title': title, 'url': f"{URL_PREFIX}{deal_id}", 'description': description, 'store': store})
+
+    yield db, term_ids
+
+    with db.engine.begin() as connection:
+        connection.execute(text("DELETE FROM search_terms WHERE id = ANY(:ids)"), {'ids': term_ids})
+        connection.execute(text("DELETE FROM deals WHERE url LIKE :pattern"), {'pattern': URL_PREFIX + '%'})
+
+
+def test_sharded_rematch_matches_serial_scoring(database_url, seeded):
+    db, term_ids = seeded
+
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, 'match_existing_deals.py'),
+         '--terms', ','.join(map(str, term_ids)), '--workers', '3', '--chunk-size', '100', '--yes'],
+        env=dict(os.environ, DATABASE_URL=database_url), check=True, capture_output=True
+    )
+
+    with db.engine.connect() as connection:
+        search_terms = connection.execute(text(
+            "SELECT id, term FROM search_terms WHERE id = ANY(:ids)"
+        ), {'ids': term_ids}).all()
+        deals = connection.execute(text(
+            "SELECT id, title, description, store FROM deals WHERE url LIKE :pattern ORDER BY id"
+        ), {'pattern': URL_PREFIX + '%'}).all()
+        stored = {
+            (row.deal_id, row.search_term_id): float(row.match_score)
+            for row in connection.execute(text("""
+                SELECT m.deal_id, m.search_term_id, m.match_score
+                FROM search_matches m JOIN deals d ON d.id = m.deal_id
+                WHERE d.url LIKE :pattern AND m.search_term_id = ANY(:ids)
+            """), {'pattern': URL_PREFIX + '%', 'ids': term_ids})
+        }
+
+    expected = reference_matches([tuple(term) for term in search_terms], [tuple(deal) for deal in deals])
+    assert len(expected) > 500
+    assert stored.keys() == expected.keys()
+    # match_score is stored with two decimals
+    assert all(abs(stored[pair] - score) <= 0.005 + 1e-9 for pair, score in expected.items())
@@ -1,9 +1,12 @@
 import os
 import logging
+from functools import wraps
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
+from markupsafe import Markup
 from dotenv import load_dotenv
-from database import DatabaseManager, Deal, SearchTerm, SearchMatch, ScrapingLog
+from database import DatabaseManager, StoreFacetCache, Deal, SearchTerm, SearchMatch, ScrapingLog
+from cache import LRUCache, DataVersionListener
 
 # Load environment variables
 load_dotenv()
@@ -22,7 +25,58 @@ if not database_url:
 
 db_manager = DatabaseManager(database_url)
 
+# Store filter list, shared by every request
+store_facets = StoreFacetCache(db_manager, ttl=int(os.getenv('STORE_FACET_TTL', 300)))
+
+# Rendered pages keyed on the data version, and deal cards keyed on the deal's
+# id and updated_at. The TTL bounds how stale relative times ("5 minutes ago") get
+cache_ttl = int(os.getenv('WEB_CACHE_TTL', 60))
+response_cache = LRUCache(max_entries=int(os.getenv('WEB_CACHE_SIZE', 256)), ttl=cache_ttl)
+fragment_cache = LRUCache(max_entries=int(os.getenv('WEB_FRAGMENT_CACHE_SIZE', 2000)), ttl=cache_ttl)
+data_version = DataVersionListener(db_manager)
+data_version.start()
+
+def cached_page(view):
+    """Serve a GET view from the response cache while the data version is unchanged"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = data_version.version
+        # Pending flash messages belong to one visitor; unknown versions can't be trusted
+        if version is None or '_flashes' in session:
+            return view(*args, **kwargs)
+        
+        key = (version, request.full_path)
+        cached = response_cache.get(key)
+        if cached is not None:
+            body, status, mimetype = cached
+            return app.response_class(body, status=status, mimetype=mimetype)
+        
+        response = app.make_response(view(*args, **kwargs))
+        # A view that flashed (e.g. its error fallback) has modified the session
+        if response.status_code == 200 and not session.modified:
+            response_cache.set(key, (response.get_data(), response.status_code, response.mimetype))
+        return response
+    return wrapper
+
+@app.after_request
+def invalidate_after_write(response):
+    """Drop cached pages after a form post so its redirect shows the change at once"""
+    if request.method != 'GET':
+        response_cache.clear()
+    return response
+
+@app.template_global()
+def deal_fragment(template_name, deal):
+    """Render a deal card template, reusing the markup until the deal changes"""
+    key = (template_name, deal.id, deal.updated_at)
+    html = fragment_cache.get(key)
+    if html is None:
+        html = Markup(render_template(template_name, deal=deal))
+        fragment_cache.set(key, html)
+    return html
+
 @app.route('/')
+@cached_page
 def index():
     """Homepage - Summary of recent deals"""
     try:
@@ -44,42 +98,69 @@ def index():
         flash(f"Error loading deals: {str(e)}", 'error')
         return render_template('index.html', recent_deals=[], matched_deals=[], stats={})
 
+def encode_cursor(deal):
+    """Pagination cursor for a deal: its created_at and id"""
+    return f"{deal.created_at.isoformat()}_{deal.id}"
+
+def decode_cursor(cursor):
+    """Parse a cursor from the URL into (created_at, id), or None if missing or invalid"""
+    if not cursor:
+        return None
+    try:
+        created_at, deal_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(created_at), int(deal_id)
+    except ValueError:
+        return None
+
 @app.route('/deals')
+@cached_page
 def deals():
     """All deals page with optional store filtering"""
     try:
-        page = request.args.get('page', 1, type=int)
+        store_id = request.args.get('store_id', type=int)
         store_filter = request.args.get('store', '').strip()
+        after = decode_cursor(request.args.get('after'))
+        before = decode_cursor(request.args.get('before'))
+        # Page number is only displayed; the cursors decide what is shown
+        page = request.args.get('page', 1, type=int) if (after or before) else 1
         per_page = 20
         
         # Get available stores for the filter dropdown
-        available_stores = db_manager.get_available_stores(min_deals=2)
+        available_stores = store_facets.get()
+        if store_id is not None:
+            # Stores with too few live deals for the list can still be linked to
+            store_filter = store_facets.name_of(store_id)
+            if store_filter is None:
+                store = db_manager.get_store(store_id)
+                store_filter = store.name if store else ''
         
         # Get deals with optional store filter
-        if store_filter:
-            deals = db_manager.get_recent_deals(limit=per_page * page, store_filter=store_filter)
-        else:
-            deals = db_manager.get_recent_deals(limit=per_page * page)
-        
-        # Pagination logic (simple for now)
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        page_deals = deals[start_idx:end_idx]
+        page_deals, has_prev, has_next = db_manager.get_deals_page(
+            limit=per_page,
+            store_filter=store_filter or None,
+            after=after,
+            before=None if after else before,
+            store_id=store_id
+        )
         
-        has_next = len(deals) > end_idx
-        has_prev = page > 1
+        if not page_deals:
+            has_prev = has_next = False
+            page = 1
         
         return render_template('deals.html', 
                              deals=page_deals,
                              page=page,
                              has_next=has_next,
                              has_prev=has_prev,
+                             next_cursor=encode_cursor(page_deals[-1]) if has_next else None,
+                             prev_cursor=encode_cursor(page_deals[0]) if has_prev else None,
                              available_stores=available_stores,
+                             current_store_id=store_id,
                              current_store_filter=store_filter)
     except Exception as e:
         logger.error(f"Error loading deals page: {e}")
         flash(f"Error loading deals: {str(e)}", 'error')
-        return render_template('deals.html', deals=[], page=1, has_next=False, has_prev=False, available_stores=[], current_store_filter='')
+        return render_template('deals.html', deals=[], page=1, has_next=False, has_prev=False, next_cursor=None, prev_cursor=None, available_stores=[], current_store_id=None, current_store_filter='')
 
 @app.route('/search-terms')
 def search_terms():
@@ -168,6 +249,7 @@ def delete_search_term(term_id):
     return redirect(url_for('search_terms'))
 
 @app.route('/matched-deals')
+@cached_page
 def matched_deals():
     """Matched deals page"""
     try:
@@ -200,6 +282,7 @@ def logs():
         return render_template('logs.html', logs=[])
 
 @app.route('/api/stats')
+@cached_page
 def api_stats():
     """API endpoint for statistics"""
     try:
@@ -209,6 +292,15 @@ def api_stats():
         logger.error(f"Error getting stats: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/cache-stats')
+def api_cache_stats():
+    """Hit and miss counters of the web caches"""
+    return jsonify({
+        'data_version': data_version.version,
+        'responses': response_cache.stats(),
+        'fragments': fragment_cache.stats()
+    })
+
 @app.route('/health')
 def health_check():
     """Health check endpoint"""
@@ -0,0 +1,122 @@
+"""
+OzBargain Monitor - Web Caches
+
+An in-process LRU cache with a TTL for rendered responses and deal card
+fragments, and a listener that keeps a data version cached pages can be
+keyed on. The database notifies data_changed when a commit changes what the
+views show (new deals, content or liveness changes, matches, search terms),
+and the version moves on each notification, so a cached page stays valid
+until then.
+"""
+
+import time
+import select
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DATA_CHANGED_CHANNEL = 'data_changed'
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, max_entries=256, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached value, or None if it is missing or expired"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+class DataVersionListener:
+    """Keeps a data version, advanced on each LISTEN data_changed notification.
+
+    The version is local to this process; nothing is read or written in the
+    database to move it. It is None until the listener is connected and
+    again whenever the connection is lost, so callers can stop caching while
+    changes may be going unnoticed.
+    """
+
+    def __init__(self, db_manager, reconnect_delay=5):
+        self.db = db_manager
+        self.reconnect_delay = reconnect_delay
+        self.version = None
+        self.latest = 0
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='data-version-listener', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            connection = None
+            try:
+                connection = self.db.listen(DATA_CHANGED_CHANNEL)
+                # Changes made while not listening went unnoticed; start a new version
+                self.advance()
+                logger.info(f"Following data changes from version {self.version}")
+
+                while True:
+                    ready, _, _ = select.select([connection], [], [], 60)
+                    if not ready:
+                        continue
+                    connection.poll()
+                    if connection.notifies:
+                        connection.notifies.clear()
+                        self.advance()
+            except Exception as e:
+                self.version = None
+                logger.error(f"Data version listener failed, retrying in {self.reconnect_delay}s: {e}")
+                time.sleep(self.reconnect_delay)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def advance(self):
+        self.latest += 1
+        self.version = self.latest